@@ -76,7 +76,7 @@ class ConfigManager:
             },
             "export": {
                 "default_format": "csv",
-                "parquet_compression": "snappy",
+                "parquet_compression": "zstd",
                 "csv_encoding": "utf-8"
             },
             "projects": {
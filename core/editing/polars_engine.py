@@ -3,7 +3,8 @@ Polars Engine Module
 Data transformations using Polars
 """
 import polars as pl
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Union, Tuple, Callable
+import json
 import logging
 import os
 
@@ -12,21 +13,71 @@ logger = logging.getLogger(__name__)
 # Token optimization constants
 SAMPLE_OUTPUT_LIMIT = 50
 
+# Aggregation function name -> Polars expression method
+_AGG_FUNCTIONS = {
+    'sum': 'sum',
+    'avg': 'mean',
+    'mean': 'mean',
+    'count': 'count',
+    'min': 'min',
+    'max': 'max',
+    'first': 'first',
+    'last': 'last',
+}
+
+# Transform type -> PolarsEngine handler method
+_TRANSFORM_HANDLERS = {
+    'filter': '_transform_filter',
+    'select': '_transform_select',
+    'rename': '_transform_rename',
+    'rename_column': '_transform_rename',
+    'rename_columns': '_transform_rename',
+    'cast': '_transform_cast',
+    'aggregate': '_transform_aggregate',
+    'sort': '_transform_sort',
+    'fill_null': '_transform_fill_null',
+    'add_column': '_transform_add_column',
+    'drop_columns': '_transform_drop_columns',
+    'drop_nulls': '_transform_drop_nulls',
+    'unique': '_transform_unique',
+    'limit': '_transform_limit',
+}
+
 
 class PolarsEngine:
     """Executes data operations using Polars"""
 
     def __init__(self):
-        pass
+        # path -> (mtime_ns, size, schema) inferred on a previous CSV read
+        self._schema_cache: Dict[str, Tuple[int, int, pl.Schema]] = {}
+
+    def _cached_csv_schema(self, path: str) -> Tuple[str, os.stat_result, Optional[pl.Schema]]:
+        """
+        Look up the schema inferred on an earlier read of an unchanged CSV.
+
+        Returns:
+            (absolute path, stat, schema or None) - path and stat key a new cache entry
+        """
+        abs_path = os.path.abspath(path)
+        stat = os.stat(abs_path)
+        entry = self._schema_cache.get(abs_path)
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return abs_path, stat, entry[2]
+        return abs_path, stat, None
 
     def load_file(self, path: str, n_rows: Optional[int] = None) -> pl.DataFrame:
         """Load a file into a DataFrame"""
         ext = os.path.splitext(path)[1].lower()
 
         if ext == '.csv':
+            # Reuse the schema of an unchanged file to skip CSV type inference
+            abs_path, stat, cached = self._cached_csv_schema(path)
             if n_rows:
-                return pl.read_csv(path, n_rows=n_rows)
-            return pl.read_csv(path)
+                return pl.read_csv(path, n_rows=n_rows, schema=cached)
+            df = pl.read_csv(path, schema=cached)
+            if cached is None:
+                self._schema_cache[abs_path] = (stat.st_mtime_ns, stat.st_size, df.schema)
+            return df
         elif ext == '.parquet':
             if n_rows:
                 return pl.read_parquet(path, n_rows=n_rows)
@@ -36,6 +87,19 @@ class PolarsEngine:
         else:
             raise ValueError(f"Unsupported file format: {ext}")
 
+    def scan_file(self, path: str) -> pl.LazyFrame:
+        """Lazily scan a file so projections push down into the reader"""
+        ext = os.path.splitext(path)[1].lower()
+
+        if ext == '.csv':
+            return pl.scan_csv(path, schema=self._cached_csv_schema(path)[2])
+        elif ext == '.parquet':
+            return pl.scan_parquet(path)
+        elif ext in ['.xlsx', '.xls']:
+            return pl.read_excel(path).lazy()
+        else:
+            raise ValueError(f"Unsupported file format: {ext}")
+
     def save_file(self, df: pl.DataFrame, path: str, format: str = 'csv'):
         """Save a DataFrame to file"""
         if format == 'parquet' or path.endswith('.parquet'):
@@ -49,37 +113,41 @@ class PolarsEngine:
         conditions: List[Dict[str, Any]]
     ) -> pl.DataFrame:
         """Filter rows based on conditions"""
-        result = df
+        # Build one combined predicate so Polars evaluates a single filter
+        predicates = []
 
         for cond in conditions:
             column = cond['column']
             operator = cond.get('operator', '==')
-            value = cond['value']
+            value = cond.get('value')
+            col = pl.col(column)
 
             if operator == '==':
-                result = result.filter(pl.col(column) == value)
+                predicates.append(col == value)
             elif operator == '!=':
-                result = result.filter(pl.col(column) != value)
+                predicates.append(col != value)
             elif operator == '>':
-                result = result.filter(pl.col(column) > value)
+                predicates.append(col > value)
             elif operator == '>=':
-                result = result.filter(pl.col(column) >= value)
+                predicates.append(col >= value)
             elif operator == '<':
-                result = result.filter(pl.col(column) < value)
+                predicates.append(col < value)
             elif operator == '<=':
-                result = result.filter(pl.col(column) <= value)
+                predicates.append(col <= value)
             elif operator == 'in':
-                result = result.filter(pl.col(column).is_in(value))
+                predicates.append(col.is_in(value))
             elif operator == 'not_in':
-                result = result.filter(~pl.col(column).is_in(value))
+                predicates.append(~col.is_in(value))
             elif operator == 'contains':
-                result = result.filter(pl.col(column).str.contains(value))
+                predicates.append(col.str.contains(value))
             elif operator == 'is_null':
-                result = result.filter(pl.col(column).is_null())
+                predicates.append(col.is_null())
             elif operator == 'is_not_null':
-                result = result.filter(pl.col(column).is_not_null())
+                predicates.append(col.is_not_null())
 
-        return result
+        if not predicates:
+            return df
+        return df.filter(pl.all_horizontal(predicates))
 
     def aggregate(
         self,
@@ -93,22 +161,12 @@ class PolarsEngine:
         for agg in aggregations:
             column = agg['column']
             func = agg.get('function', 'sum')
-            alias = agg.get('alias', f"{column}_{func}")
+            method = _AGG_FUNCTIONS.get(func)
+            if method is None:
+                continue
 
-            if func == 'sum':
-                agg_exprs.append(pl.col(column).sum().alias(alias))
-            elif func == 'avg' or func == 'mean':
-                agg_exprs.append(pl.col(column).mean().alias(alias))
-            elif func == 'count':
-                agg_exprs.append(pl.col(column).count().alias(alias))
-            elif func == 'min':
-                agg_exprs.append(pl.col(column).min().alias(alias))
-            elif func == 'max':
-                agg_exprs.append(pl.col(column).max().alias(alias))
-            elif func == 'first':
-                agg_exprs.append(pl.col(column).first().alias(alias))
-            elif func == 'last':
-                agg_exprs.append(pl.col(column).last().alias(alias))
+            alias = agg.get('alias', f"{column}_{func}")
+            agg_exprs.append(getattr(pl.col(column), method)().alias(alias))
 
         return df.group_by(group_by).agg(agg_exprs)
 
@@ -173,15 +231,13 @@ class PolarsEngine:
             return df.with_columns(pl.col(column).forward_fill())
         elif strategy == 'backward':
             return df.with_columns(pl.col(column).backward_fill())
+        # Statistics are computed inside the expression, in the same pass as the fill
         elif strategy == 'mean':
-            mean_val = df[column].mean()
-            return df.with_columns(pl.col(column).fill_null(mean_val))
+            return df.with_columns(pl.col(column).fill_null(pl.col(column).mean()))
         elif strategy == 'median':
-            median_val = df[column].median()
-            return df.with_columns(pl.col(column).fill_null(median_val))
+            return df.with_columns(pl.col(column).fill_null(pl.col(column).median()))
         elif strategy == 'mode':
-            mode_val = df[column].mode().first()
-            return df.with_columns(pl.col(column).fill_null(mode_val))
+            return df.with_columns(pl.col(column).fill_null(pl.col(column).mode().first()))
         else:
             return df
 
@@ -204,13 +260,185 @@ class PolarsEngine:
             'datetime': pl.Datetime
         }
 
+        schema = df.schema
         exprs = []
         for column, target_type in casts.items():
             pl_type = type_map.get(target_type.lower(), pl.Utf8)
+            # Casting to the current dtype is a no-op
+            if column in schema and schema[column] == pl_type:
+                continue
             exprs.append(pl.col(column).cast(pl_type))
 
+        if not exprs:
+            return df
         return df.with_columns(exprs)
 
+    def _normalize_transforms(
+        self,
+        transformations: List[Any]
+    ) -> List[Tuple[Callable, Dict[str, Any]]]:
+        """
+        Validate and normalize the transformation list once, up front.
+
+        JSON strings are parsed, the type key is resolved and lower-cased,
+        and nested config is merged with top-level keys. Invalid or
+        unrecognized entries become report-only steps, so they appear in
+        transforms_executed in input order.
+
+        Returns:
+            List of (handler, config) pairs ready to apply in order
+        """
+        steps = []
+        for i, transform in enumerate(transformations):
+            # Handle case where transform might be a string (JSON not parsed)
+            if isinstance(transform, str):
+                try:
+                    transform = json.loads(transform)
+                except Exception as e:
+                    logger.error(f"Transform {i} is not valid JSON: {e}")
+                    steps.append(('_report_skipped', {'index': i, 'error': 'invalid JSON string'}))
+                    continue
+
+            if not isinstance(transform, dict):
+                logger.error(f"Transform {i} is not a dict: {type(transform).__name__}")
+                steps.append(('_report_skipped', {'index': i, 'error': f'not a dict: {type(transform).__name__}'}))
+                continue
+
+            # Get transform type - check multiple possible key names and normalize
+            transform_type = str(
+                transform.get('type') or
+                transform.get('operation') or
+                transform.get('op') or
+                ''
+            ).lower().strip()
+
+            if transform_type not in _TRANSFORM_HANDLERS:
+                logger.warning(f"Unrecognized transform type: '{transform_type}'. Full transform: {transform}")
+                steps.append(('_report_skipped', {
+                    'type': transform_type or '(empty)',
+                    'executed': False,
+                    'reason': 'unrecognized transform type',
+                    'raw_transform': transform
+                }))
+                continue
+
+            # Support both nested config and flat structure
+            config = dict(transform.get('config', {}))
+            # Merge top-level keys into config
+            for key, value in transform.items():
+                if key not in ('type', 'operation', 'op', 'config') and key not in config:
+                    config[key] = value
+
+            # Filters without conditions carry no information
+            if transform_type == 'filter' and not config.get('conditions'):
+                continue
+
+            handler = _TRANSFORM_HANDLERS[transform_type]
+
+            # sort followed by limit: O(n log k) top-k instead of a full sort (an internal step)
+            if (
+                transform_type == 'limit' and steps and steps[-1][0] == '_transform_sort'
+                and steps[-1][1].get('columns')
+            ):
+                sort_config = steps.pop()[1]
+                handler = '_transform_top_k'
+                config = {
+                    'columns': sort_config['columns'],
+                    'descending': sort_config.get('descending', False),
+                    'n': config.get('n', 1000)
+                }
+
+            steps.append((handler, config))
+
+        return [(getattr(self, handler), config) for handler, config in steps]
+
+    def _report_skipped(self, df: pl.DataFrame, entry: Dict[str, Any], executed: List) -> pl.DataFrame:
+        executed.append(entry)
+        return df
+
+    def _transform_filter(self, df: pl.DataFrame, config: Dict[str, Any], executed: List) -> pl.DataFrame:
+        return self.filter_rows(df, config.get('conditions', []))
+
+    def _transform_select(self, df: pl.DataFrame, config: Dict[str, Any], executed: List) -> pl.DataFrame:
+        columns = config.get('columns') or config.get('column') or config.get('cols')
+        if not columns:
+            executed.append({'type': 'select', 'executed': False, 'reason': 'no columns specified'})
+            return df
+        if isinstance(columns, str):
+            columns = [columns]
+        executed.append({'type': 'select', 'columns': columns, 'executed': True})
+        # Selecting every column in its current order is a no-op
+        if columns == df.columns:
+            return df
+        return df.select(columns)
+
+    def _transform_rename(self, df: pl.DataFrame, config: Dict[str, Any], executed: List) -> pl.DataFrame:
+        renames = config.get('renames', {})
+        # Also support single column rename with 'old_name' and 'new_name'
+        if not renames:
+            old_name = config.get('old_name') or config.get('from') or config.get('column')
+            new_name = config.get('new_name') or config.get('to') or config.get('name')
+            if old_name and new_name:
+                renames = {old_name: new_name}
+        return df.rename(renames)
+
+    def _transform_cast(self, df: pl.DataFrame, config: Dict[str, Any], executed: List) -> pl.DataFrame:
+        return self.cast_columns(df, config.get('casts', {}))
+
+    def _transform_aggregate(self, df: pl.DataFrame, config: Dict[str, Any], executed: List) -> pl.DataFrame:
+        return self.aggregate(df, config.get('group_by', []), config.get('aggregations', []))
+
+    def _transform_sort(self, df: pl.DataFrame, config: Dict[str, Any], executed: List) -> pl.DataFrame:
+        return df.sort(config.get('columns', []), descending=config.get('descending', False))
+
+    def _transform_top_k(self, df: pl.DataFrame, config: Dict[str, Any], executed: List) -> pl.DataFrame:
+        # Folded sort + limit: reported as the limit the caller sent
+        n = config.get('n', 1000)
+        executed.append({'type': 'limit', 'n': n, 'executed': True})
+        # The lazy planner pushes the slice into the sort, so only the
+        # first n rows are kept ordered instead of sorting the whole frame
+        return (
+            df.lazy()
+            .sort(config.get('columns', []), descending=config.get('descending', False))
+            .head(n)
+            .collect()
+        )
+
+    def _transform_fill_null(self, df: pl.DataFrame, config: Dict[str, Any], executed: List) -> pl.DataFrame:
+        column = config.get('column')
+        if not column:
+            return df
+        return self.fill_nulls(df, column, config.get('strategy', 'literal'), config.get('value'))
+
+    def _transform_add_column(self, df: pl.DataFrame, config: Dict[str, Any], executed: List) -> pl.DataFrame:
+        name = config.get('name')
+        expression = config.get('expression')
+        if not (name and expression):
+            return df
+        # Simple expression evaluation
+        return df.with_columns(pl.lit(expression).alias(name))
+
+    def _transform_drop_columns(self, df: pl.DataFrame, config: Dict[str, Any], executed: List) -> pl.DataFrame:
+        return df.drop(config.get('columns', []))
+
+    def _transform_drop_nulls(self, df: pl.DataFrame, config: Dict[str, Any], executed: List) -> pl.DataFrame:
+        columns = config.get('columns')
+        if columns:
+            return df.drop_nulls(subset=columns)
+        return df.drop_nulls()
+
+    def _transform_unique(self, df: pl.DataFrame, config: Dict[str, Any], executed: List) -> pl.DataFrame:
+        columns = config.get('columns')
+        keep = config.get('keep', 'first')
+        if columns:
+            return df.unique(subset=columns, keep=keep)
+        return df.unique(keep=keep)
+
+    def _transform_limit(self, df: pl.DataFrame, config: Dict[str, Any], executed: List) -> pl.DataFrame:
+        n = config.get('n', 1000)
+        executed.append({'type': 'limit', 'n': n, 'executed': True})
+        return df.head(n)
+
     def transform(
         self,
         file_path: str,
@@ -231,122 +459,9 @@ class PolarsEngine:
             original_columns = list(df.columns)
             transforms_executed = []
 
-            for i, transform in enumerate(transformations):
-                # Handle case where transform might be a string (JSON not parsed)
-                if isinstance(transform, str):
-                    import json
-                    try:
-                        transform = json.loads(transform)
-                    except Exception as e:
-                        logger.error(f"Transform {i} is not valid JSON: {e}")
-                        transforms_executed.append({'index': i, 'error': 'invalid JSON string'})
-                        continue
-
-                if not isinstance(transform, dict):
-                    logger.error(f"Transform {i} is not a dict: {type(transform).__name__}")
-                    transforms_executed.append({'index': i, 'error': f'not a dict: {type(transform).__name__}'})
-                    continue
-
-                # Get transform type - check multiple possible key names and normalize
-                transform_type = str(
-                    transform.get('type') or
-                    transform.get('operation') or
-                    transform.get('op') or
-                    ''
-                ).lower().strip()
-
-                # Support both nested config and flat structure
-                config = dict(transform.get('config', {}))
-                # Merge top-level keys into config
-                for key, value in transform.items():
-                    if key not in ('type', 'operation', 'op', 'config') and key not in config:
-                        config[key] = value
-
-                if transform_type == 'filter':
-                    conditions = config.get('conditions', [])
-                    df = self.filter_rows(df, conditions)
-
-                elif transform_type == 'select':
-                    columns = config.get('columns') or config.get('column') or config.get('cols')
-                    if columns:
-                        if isinstance(columns, str):
-                            columns = [columns]
-                        df = df.select(columns)
-                        transforms_executed.append({'type': 'select', 'columns': columns, 'executed': True})
-                    else:
-                        transforms_executed.append({'type': 'select', 'executed': False, 'reason': 'no columns specified'})
-
-                elif transform_type in ('rename', 'rename_column', 'rename_columns'):
-                    renames = config.get('renames', {})
-                    # Also support single column rename with 'old_name' and 'new_name'
-                    if not renames:
-                        old_name = config.get('old_name') or config.get('from') or config.get('column')
-                        new_name = config.get('new_name') or config.get('to') or config.get('name')
-                        if old_name and new_name:
-                            renames = {old_name: new_name}
-                    df = df.rename(renames)
-
-                elif transform_type == 'cast':
-                    casts = config.get('casts', {})
-                    df = self.cast_columns(df, casts)
-
-                elif transform_type == 'aggregate':
-                    group_by = config.get('group_by', [])
-                    aggregations = config.get('aggregations', [])
-                    df = self.aggregate(df, group_by, aggregations)
-
-                elif transform_type == 'sort':
-                    columns = config.get('columns', [])
-                    descending = config.get('descending', False)
-                    df = df.sort(columns, descending=descending)
-
-                elif transform_type == 'fill_null':
-                    column = config.get('column')
-                    strategy = config.get('strategy', 'literal')
-                    value = config.get('value')
-                    if column:
-                        df = self.fill_nulls(df, column, strategy, value)
-
-                elif transform_type == 'add_column':
-                    name = config.get('name')
-                    expression = config.get('expression')
-                    if name and expression:
-                        # Simple expression evaluation
-                        df = df.with_columns(pl.lit(expression).alias(name))
-
-                elif transform_type == 'drop_columns':
-                    columns = config.get('columns', [])
-                    df = df.drop(columns)
-
-                elif transform_type == 'drop_nulls':
-                    columns = config.get('columns')
-                    if columns:
-                        df = df.drop_nulls(subset=columns)
-                    else:
-                        df = df.drop_nulls()
-
-                elif transform_type == 'unique':
-                    columns = config.get('columns')
-                    keep = config.get('keep', 'first')
-                    if columns:
-                        df = df.unique(subset=columns, keep=keep)
-                    else:
-                        df = df.unique(keep=keep)
-
-                elif transform_type == 'limit':
-                    n = config.get('n', 1000)
-                    df = df.head(n)
-                    transforms_executed.append({'type': 'limit', 'n': n, 'executed': True})
-
-                else:
-                    # Unrecognized transform type
-                    logger.warning(f"Unrecognized transform type: '{transform_type}'. Full transform: {transform}")
-                    transforms_executed.append({
-                        'type': transform_type or '(empty)',
-                        'executed': False,
-                        'reason': 'unrecognized transform type',
-                        'raw_transform': transform
-                    })
+            steps = self._normalize_transforms(transformations)
+            for handler, config in steps:
+                df = handler(df, config, transforms_executed)
 
             return {
                 'success': True,
@@ -403,7 +518,8 @@ class PolarsEngine:
         self,
         file_paths: List[str],
         join_keys: List[str],
-        how: str = 'inner'
+        how: str = 'inner',
+        needed_columns: Optional[Dict[int, List[str]]] = None
     ) -> Dict[str, Any]:
         """
         Join multiple files on common keys.
@@ -412,6 +528,8 @@ class PolarsEngine:
             file_paths: List of file paths to join
             join_keys: Column names to join on
             how: Join type ('inner', 'left', 'outer', 'cross')
+            needed_columns: Optional map of file index to the non-key columns
+                to keep from that file; files not listed keep all columns
 
         Returns:
             Join result with 'success' and 'df' keys
@@ -420,22 +538,32 @@ class PolarsEngine:
             if len(file_paths) < 2:
                 return {'success': False, 'error': 'At least 2 files required for join'}
 
-            dfs = [self.load_file(path) for path in file_paths]
+            # Scan lazily so column pruning reaches the file readers
+            dfs = [self.scan_file(path) for path in file_paths]
+
+            if needed_columns:
+                for key, columns in needed_columns.items():
+                    i = int(key)
+                    if 0 <= i < len(dfs):
+                        cols = list(join_keys) + [c for c in columns if c not in join_keys]
+                        dfs[i] = dfs[i].select(cols)
 
             # Start with first dataframe
-            result_df = dfs[0]
+            result_lf = dfs[0]
 
             # Join subsequent dataframes
             for i, df in enumerate(dfs[1:], 1):
                 # Suffix duplicate columns
                 suffix = f"_file{i}"
-                result_df = result_df.join(
+                result_lf = result_lf.join(
                     df,
                     on=join_keys,
                     how=how,
                     suffix=suffix
                 )
 
+            result_df = result_lf.collect()
+
             return {
                 'success': True,
                 'df': result_df,
@@ -3,10 +3,13 @@ CSV Exporter Module
 Exports data to CSV format with various options
 """
 import polars as pl
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
 import os
 import logging
 
+from .export_utils import export_workers, write_with_output_dir
+
 logger = logging.getLogger(__name__)
 
 
@@ -14,7 +17,8 @@ class CSVExporter:
     """Exports data to CSV format"""
 
     def __init__(self):
-        pass
+        # Directories already created by this exporter
+        self._known_dirs: set = set()
 
     def export(
         self,
@@ -44,8 +48,6 @@ class CSVExporter:
             Export result
         """
         try:
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
             # Map quote style
             quote_map = {
                 'necessary': 'necessary',
@@ -54,14 +56,14 @@ class CSVExporter:
             }
             quote = quote_map.get(quote_style, 'necessary')
 
-            df.write_csv(
+            write_with_output_dir(output_path, self._known_dirs, lambda: df.write_csv(
                 output_path,
                 separator=delimiter,
                 include_header=include_header,
                 quote_style=quote,
                 null_value=null_value,
                 date_format=date_format
-            )
+            ))
 
             file_size = os.path.getsize(output_path)
 
@@ -87,17 +89,28 @@ class CSVExporter:
         """Export multiple DataFrames to CSV files"""
         try:
             os.makedirs(output_dir, exist_ok=True)
+            self._known_dirs.add(output_dir)
+            jobs = [
+                (name, df, os.path.join(output_dir, f"{name}.csv"))
+                for name, df in dataframes.items()
+            ]
             results = []
 
-            for name, df in dataframes.items():
-                output_path = os.path.join(output_dir, f"{name}.csv")
-                result = self.export(df, output_path, **kwargs)
-                results.append({
-                    'name': name,
-                    'path': output_path,
-                    'success': result['success'],
-                    'rows': len(df) if result['success'] else 0
-                })
+            if jobs:
+                # Polars releases the GIL while encoding, so files are written in parallel
+                with ThreadPoolExecutor(max_workers=export_workers(len(jobs))) as executor:
+                    futures = [
+                        executor.submit(self.export, df, output_path, **kwargs)
+                        for _, df, output_path in jobs
+                    ]
+                    for (name, df, output_path), future in zip(jobs, futures):
+                        result = future.result()
+                        results.append({
+                            'name': name,
+                            'path': output_path,
+                            'success': result['success'],
+                            'rows': len(df) if result['success'] else 0
+                        })
 
             return {
                 'success': all(r['success'] for r in results),
@@ -0,0 +1,37 @@
+"""
+Export Utilities Module
+Helpers shared by the file exporters
+"""
+import os
+from typing import Any, Callable
+
+# Upper bound on concurrent file writes in export_multiple
+MAX_EXPORT_WORKERS = 8
+
+
+def export_workers(job_count: int) -> int:
+    """Thread count for writing job_count files, capped by MAX_EXPORT_WORKERS and the CPU count"""
+    return max(1, min(MAX_EXPORT_WORKERS, job_count, os.cpu_count() or 1))
+
+
+def write_with_output_dir(output_path: str, known_dirs: set, write: Callable[[], Any]) -> Any:
+    """
+    Run write() with the output path's directory in place.
+
+    Directories in known_dirs are assumed to exist; if one was removed since it
+    was cached, it is recreated and the write retried once.
+    """
+    output_dir = os.path.dirname(os.fspath(output_path))
+    if not output_dir:
+        return write()
+    if output_dir not in known_dirs:
+        os.makedirs(output_dir, exist_ok=True)
+        known_dirs.add(output_dir)
+    try:
+        return write()
+    except FileNotFoundError:
+        known_dirs.discard(output_dir)
+        os.makedirs(output_dir, exist_ok=True)
+        known_dirs.add(output_dir)
+        return write()
+
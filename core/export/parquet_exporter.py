@@ -3,26 +3,58 @@ Parquet Exporter Module
 Exports data to Parquet format optimized for Power BI
 """
 import polars as pl
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
 import os
+import time
 import logging
 
+from .export_utils import export_workers, write_with_output_dir
+
 logger = logging.getLogger(__name__)
 
+# Rows per row group when the caller does not specify one
+DEFAULT_ROW_GROUP_SIZE = 131072
+
+# Data page sizes in bytes; wide tables use smaller pages
+DEFAULT_DATA_PAGE_SIZE = 1 << 20
+WIDE_TABLE_DATA_PAGE_SIZE = 16384
+WIDE_TABLE_COLUMNS = 50
+
+# Codecs that accept a compression level
+LEVELED_CODECS = ('gzip', 'brotli', 'zstd')
+
+# Row sample used by compare_compression on large tables
+COMPARE_SAMPLE_ROWS = 500_000
+
+# (codec, level) pairs tried by compare_compression
+COMPRESSION_CANDIDATES = [
+    ('snappy', None),
+    ('gzip', None),
+    ('lz4', None),
+    ('zstd', 1),
+    ('zstd', 3),
+    ('zstd', 9),
+    ('uncompressed', None),
+]
+
 
 class ParquetExporter:
     """Exports data to Parquet format"""
 
     def __init__(self):
-        pass
+        # Directories already created by this exporter
+        self._known_dirs: set = set()
 
     def export(
         self,
         df: pl.DataFrame,
         output_path: str,
-        compression: str = 'snappy',
+        compression: str = 'zstd',
         row_group_size: Optional[int] = None,
-        statistics: bool = True
+        statistics: bool = True,
+        compression_level: Optional[int] = 3,
+        data_page_size: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Export DataFrame to Parquet.
@@ -31,21 +63,33 @@ class ParquetExporter:
             df: DataFrame to export
             output_path: Output file path
             compression: Compression algorithm (snappy, gzip, lz4, zstd, none)
-            row_group_size: Rows per row group
-            statistics: Include column statistics
+            compression_level: Level for gzip/brotli/zstd; ignored by other codecs
+            row_group_size: Rows per row group (default 131072)
+            statistics: Include column statistics and the page index
+            data_page_size: Data page size in bytes (default 1 MiB, 16 KiB
+                for tables with 50 or more columns)
 
         Returns:
             Export result
         """
         try:
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            level = compression_level if compression in LEVELED_CODECS else None
+            if row_group_size is None:
+                row_group_size = DEFAULT_ROW_GROUP_SIZE
+            if data_page_size is None:
+                data_page_size = (
+                    WIDE_TABLE_DATA_PAGE_SIZE if len(df.columns) >= WIDE_TABLE_COLUMNS
+                    else DEFAULT_DATA_PAGE_SIZE
+                )
 
-            df.write_parquet(
+            write_with_output_dir(output_path, self._known_dirs, lambda: df.write_parquet(
                 output_path,
                 compression=compression,
+                compression_level=level,
                 row_group_size=row_group_size,
+                data_page_size=data_page_size,
                 statistics=statistics
-            )
+            ))
 
             file_size = os.path.getsize(output_path)
 
@@ -55,6 +99,68 @@ class ParquetExporter:
                 'row_count': len(df),
                 'column_count': len(df.columns),
                 'compression': compression,
+                'compression_level': level,
+                'file_size_bytes': file_size,
+                'file_size_mb': round(file_size / (1024 * 1024), 2)
+            }
+
+        except Exception as e:
+            logger.error(f"Error exporting Parquet: {e}", exc_info=True)
+            return {'success': False, 'error': str(e)}
+
+    def export_lazy(
+        self,
+        lf: pl.LazyFrame,
+        output_path: str,
+        compression: str = 'zstd',
+        compression_level: Optional[int] = 3,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        statistics: bool = True,
+        maintain_order: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Stream a LazyFrame to Parquet without collecting it first.
+
+        Peak memory is bounded by the row group being written rather than
+        the whole table.
+
+        Args:
+            lf: LazyFrame to export
+            output_path: Output file path
+            compression: Compression algorithm (snappy, gzip, lz4, zstd, none)
+            compression_level: Level for gzip/brotli/zstd; ignored by other codecs
+            row_group_size: Rows per row group
+            statistics: Include column statistics
+            maintain_order: Keep the input row order; False lets the
+                streaming engine write batches as they complete
+
+        Returns:
+            Export result
+        """
+        try:
+            level = compression_level if compression in LEVELED_CODECS else None
+
+            write_with_output_dir(output_path, self._known_dirs, lambda: lf.sink_parquet(
+                output_path,
+                compression=compression,
+                compression_level=level,
+                statistics=statistics,
+                row_group_size=row_group_size,
+                maintain_order=maintain_order
+            ))
+
+            file_size = os.path.getsize(output_path)
+            # Row and column counts come from the footer, not the data pages
+            written = pl.scan_parquet(output_path)
+            row_count = written.select(pl.len()).collect().item()
+
+            return {
+                'success': True,
+                'output_path': output_path,
+                'row_count': row_count,
+                'column_count': len(written.collect_schema()),
+                'compression': compression,
+                'compression_level': level,
                 'file_size_bytes': file_size,
                 'file_size_mb': round(file_size / (1024 * 1024), 2)
             }
@@ -72,26 +178,40 @@ class ParquetExporter:
         """Export multiple DataFrames to Parquet files"""
         try:
             os.makedirs(output_dir, exist_ok=True)
+            self._known_dirs.add(output_dir)
+            jobs = [
+                (name, df, os.path.join(output_dir, f"{name}.parquet"))
+                for name, df in dataframes.items()
+            ]
             results = []
 
-            for name, df in dataframes.items():
-                output_path = os.path.join(output_dir, f"{name}.parquet")
-                result = self.export(df, output_path, **kwargs)
-                results.append({
-                    'name': name,
-                    'path': output_path,
-                    'success': result['success'],
-                    'rows': len(df) if result['success'] else 0,
-                    'size_mb': result.get('file_size_mb', 0)
-                })
+            if jobs:
+                # Compression and I/O run outside the GIL, so files are written in parallel
+                with ThreadPoolExecutor(max_workers=export_workers(len(jobs))) as executor:
+                    futures = [
+                        executor.submit(self.export, df, output_path, **kwargs)
+                        for _, df, output_path in jobs
+                    ]
+                    for (name, df, output_path), future in zip(jobs, futures):
+                        result = future.result()
+                        results.append({
+                            'name': name,
+                            'path': output_path,
+                            'success': result['success'],
+                            'rows': len(df) if result['success'] else 0,
+                            'size_bytes': result.get('file_size_bytes', 0),
+                            'size_mb': result.get('file_size_mb', 0)
+                        })
 
-            total_size = sum(r.get('size_mb', 0) for r in results)
+            # Total from raw byte counts so per-file rounding does not accumulate
+            total_size = sum(r['size_bytes'] for r in results)
 
             return {
                 'success': all(r['success'] for r in results),
                 'output_dir': output_dir,
                 'files_exported': results,
-                'total_size_mb': round(total_size, 2)
+                'total_size_bytes': total_size,
+                'total_size_mb': round(total_size / (1024 * 1024), 2)
             }
 
         except Exception as e:
@@ -104,6 +224,10 @@ class ParquetExporter:
             import pyarrow.parquet as pq
 
             metadata = pq.read_metadata(file_path)
+            parquet_schema = metadata.schema
+
+            # Fetch each column descriptor once rather than once per field
+            columns = [parquet_schema.column(i) for i in range(metadata.num_columns)]
 
             return {
                 'success': True,
@@ -115,11 +239,11 @@ class ParquetExporter:
                 'serialized_size': metadata.serialized_size,
                 'schema': [
                     {
-                        'name': metadata.schema[i].name,
-                        'physical_type': str(metadata.schema[i].physical_type),
-                        'logical_type': str(metadata.schema[i].logical_type)
+                        'name': column.name,
+                        'physical_type': str(column.physical_type),
+                        'logical_type': str(column.logical_type)
                     }
-                    for i in range(metadata.num_columns)
+                    for column in columns
                 ]
             }
 
@@ -130,32 +254,44 @@ class ParquetExporter:
     def compare_compression(
         self,
         df: pl.DataFrame,
-        output_dir: str
+        output_dir: str,
+        sample_rows: int = COMPARE_SAMPLE_ROWS
     ) -> Dict[str, Any]:
-        """Compare different compression algorithms"""
+        """
+        Compare different compression algorithms.
+
+        Tables larger than sample_rows are compared on a uniform row sample;
+        codec rankings are stable under sampling, and sizes are scaled back
+        up in 'estimated_file_size_mb'.
+        """
         try:
             os.makedirs(output_dir, exist_ok=True)
-            compressions = ['snappy', 'gzip', 'lz4', 'zstd', 'uncompressed']
             results = []
 
-            for comp in compressions:
-                output_path = os.path.join(output_dir, f"test_{comp}.parquet")
+            sample_df = df if len(df) <= sample_rows else df.sample(n=sample_rows, seed=0)
+            scale = len(df) / len(sample_df) if len(sample_df) else 1.0
+
+            for comp, level in COMPRESSION_CANDIDATES:
+                suffix = f"{comp}_{level}" if level is not None else comp
+                output_path = os.path.join(output_dir, f"test_{suffix}.parquet")
 
-                import time
-                start = time.time()
-                df.write_parquet(output_path, compression=comp if comp != 'uncompressed' else None)
-                write_time = time.time() - start
+                start = time.perf_counter()
+                sample_df.write_parquet(output_path, compression=comp, compression_level=level)
+                write_time = time.perf_counter() - start
 
-                file_size = os.path.getsize(output_path)
+                file_size = os.stat(output_path).st_size
 
-                start = time.time()
-                _ = pl.read_parquet(output_path)
-                read_time = time.time() - start
+                # Memory-map the read-back so it is not double-buffered through the page cache
+                start = time.perf_counter()
+                _ = pl.read_parquet(output_path, memory_map=True)
+                read_time = time.perf_counter() - start
 
                 results.append({
                     'compression': comp,
+                    'compression_level': level,
                     'file_size_bytes': file_size,
                     'file_size_mb': round(file_size / (1024 * 1024), 2),
+                    'estimated_file_size_mb': round(file_size * scale / (1024 * 1024), 2),
                     'write_time_sec': round(write_time, 3),
                     'read_time_sec': round(read_time, 3)
                 })
@@ -168,8 +304,10 @@ class ParquetExporter:
             return {
                 'success': True,
                 'row_count': len(df),
+                'sampled_rows': len(sample_df),
                 'comparison': results,
-                'recommended': results[0]['compression']
+                'recommended': results[0]['compression'],
+                'recommended_level': results[0]['compression_level']
             }
 
         except Exception as e:
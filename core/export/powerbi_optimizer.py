@@ -3,11 +3,49 @@ Power BI Optimizer Module
 Optimizes data for Power BI consumption
 """
 import polars as pl
+from collections import defaultdict
+from functools import lru_cache
+from itertools import combinations
 from typing import Dict, Any, Optional, List
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+INTEGER_DTYPES = frozenset({
+    pl.Int8, pl.Int16, pl.Int32, pl.Int64,
+    pl.UInt8, pl.UInt16, pl.UInt32, pl.UInt64
+})
+NUMERIC_DTYPES = INTEGER_DTYPES | {pl.Float32, pl.Float64}
+
+# Rows used to estimate the optimized size when returning a LazyFrame
+LAZY_SIZE_SAMPLE_ROWS = 10_000
+
+# Column names that look like keys: *_key, *_id or a bare id
+KEY_COLUMN_RE = re.compile(r'(?:_key|_id|^id)$', re.IGNORECASE)
+
+# Largest finite Float32 value
+FLOAT32_MAX = 3.4028234663852886e38
+
+# (min, max, dtype, optimization) candidates for integer downcasting, tightest first
+INT_DOWNCASTS = [
+    (0, 255, pl.UInt8, 'downcast_to_uint8'),
+    (-128, 127, pl.Int8, 'downcast_to_int8'),
+    (0, 65535, pl.UInt16, 'downcast_to_uint16'),
+    (-32768, 32767, pl.Int16, 'downcast_to_int16'),
+]
+
+
+@lru_cache(maxsize=4096)
+def _normalize_column_name(name: str) -> str:
+    """Lower-case a key column name and strip one _key/_id/id suffix"""
+    lowered = name.lower()
+    for suffix in ('_key', '_id', 'id'):
+        if lowered.endswith(suffix):
+            # A bare 'id' keeps its name so it only matches another 'id'
+            return lowered[:-len(suffix)] or lowered
+    return lowered
+
 
 class PowerBIOptimizer:
     """Optimizes data for Power BI"""
@@ -18,7 +56,8 @@ class PowerBIOptimizer:
     def optimize_for_powerbi(
         self,
         df: pl.DataFrame,
-        table_type: str = 'dimension'
+        table_type: str = 'dimension',
+        return_lazy: bool = False
     ) -> Dict[str, Any]:
         """
         Optimize DataFrame for Power BI.
@@ -26,124 +65,156 @@ class PowerBIOptimizer:
         Args:
             df: DataFrame to optimize
             table_type: Type of table (dimension, fact, bridge)
+            return_lazy: Return the casts as 'optimized_lf' (a LazyFrame)
+                instead of materializing 'optimized_df'; the optimized size
+                is then estimated from a sample
 
         Returns:
             Optimized DataFrame and optimization report
         """
         try:
             optimizations = []
-            optimized_df = df.clone()
-
-            # 1. Convert high-cardinality strings to categoricals
-            for col in optimized_df.columns:
-                if optimized_df[col].dtype == pl.Utf8:
-                    unique_count = optimized_df[col].n_unique()
-                    total_count = len(optimized_df)
-
-                    if unique_count < total_count * 0.5:
-                        optimized_df = optimized_df.with_columns(
-                            pl.col(col).cast(pl.Categorical)
-                        )
-                        optimizations.append({
-                            'column': col,
-                            'optimization': 'string_to_categorical',
-                            'unique_values': unique_count
-                        })
-
-            # 2. Downcast numeric types
-            for col in optimized_df.columns:
-                dtype = optimized_df[col].dtype
-
-                if dtype in [pl.Int64, pl.Int32]:
-                    min_val = optimized_df[col].min()
-                    max_val = optimized_df[col].max()
-
-                    if min_val is not None and max_val is not None:
-                        if min_val >= 0 and max_val <= 255:
-                            optimized_df = optimized_df.with_columns(
-                                pl.col(col).cast(pl.UInt8)
-                            )
-                            optimizations.append({
-                                'column': col,
-                                'optimization': 'downcast_to_uint8',
-                                'range': f"{min_val}-{max_val}"
-                            })
-                        elif min_val >= -128 and max_val <= 127:
-                            optimized_df = optimized_df.with_columns(
-                                pl.col(col).cast(pl.Int8)
-                            )
-                            optimizations.append({
-                                'column': col,
-                                'optimization': 'downcast_to_int8',
-                                'range': f"{min_val}-{max_val}"
-                            })
-                        elif min_val >= 0 and max_val <= 65535:
-                            optimized_df = optimized_df.with_columns(
-                                pl.col(col).cast(pl.UInt16)
-                            )
-                            optimizations.append({
-                                'column': col,
-                                'optimization': 'downcast_to_uint16',
-                                'range': f"{min_val}-{max_val}"
-                            })
-                        elif min_val >= -32768 and max_val <= 32767:
-                            optimized_df = optimized_df.with_columns(
-                                pl.col(col).cast(pl.Int16)
-                            )
-                            optimizations.append({
-                                'column': col,
-                                'optimization': 'downcast_to_int16',
-                                'range': f"{min_val}-{max_val}"
-                            })
-
-                elif dtype == pl.Float64:
-                    # Check if can be Float32
-                    optimized_df = optimized_df.with_columns(
-                        pl.col(col).cast(pl.Float32)
-                    )
+            schema = df.schema
+            total_count = len(df)
+
+            string_cols = [c for c, dtype in schema.items() if dtype == pl.Utf8]
+            int_cols = [c for c, dtype in schema.items() if dtype in [pl.Int64, pl.Int32]]
+            float_cols = [c for c, dtype in schema.items() if dtype == pl.Float64]
+            key_cols = []
+            if table_type == 'fact':
+                # Fact tables should have integer keys
+                key_cols = [
+                    c for c, dtype in schema.items()
+                    if c.endswith(('_key', '_id')) and dtype not in INTEGER_DTYPES
+                ]
+
+            # Gather every statistic needed for the decisions below in one pass
+            stat_exprs = []
+            stat_keys = []
+            for col in string_cols:
+                stat_keys.append((col, 'n_unique'))
+                stat_exprs.append(pl.col(col).n_unique())
+            for col in int_cols:
+                stat_keys.append((col, 'min'))
+                stat_exprs.append(pl.col(col).min())
+                stat_keys.append((col, 'max'))
+                stat_exprs.append(pl.col(col).max())
+            for col in float_cols:
+                # Largest finite magnitude, to keep Float32 casts from overflowing
+                stat_keys.append((col, 'abs_max'))
+                stat_exprs.append(pl.col(col).filter(pl.col(col).is_finite()).abs().max())
+            for col in key_cols:
+                # A key is castable when the non-strict cast introduces no new nulls
+                stat_keys.append((col, 'castable'))
+                stat_exprs.append(
+                    pl.col(col).cast(pl.Int32, strict=False).null_count() == pl.col(col).null_count()
+                )
+
+            stats = {}
+            if stat_exprs:
+                row = df.lazy().select(
+                    [expr.alias(str(i)) for i, expr in enumerate(stat_exprs)]
+                ).collect().row(0)
+                stats = dict(zip(stat_keys, row))
+
+            exprs = []
+            key_set = set()
+
+            # 1. Fact table keys to integers
+            for col in key_cols:
+                if stats[(col, 'castable')]:
+                    exprs.append(pl.col(col).cast(pl.Int32))
+                    key_set.add(col)
+                    optimizations.append({
+                        'column': col,
+                        'optimization': 'key_to_integer'
+                    })
+
+            # 2. Convert low-cardinality strings to enums; the dictionary is
+            # closed, so a fixed Enum avoids the global categorical string cache
+            enum_cols = [
+                col for col in string_cols
+                if col not in key_set and stats[(col, 'n_unique')] < total_count * 0.5
+            ]
+            if enum_cols:
+                categories = df.select([
+                    pl.col(col).drop_nulls().unique().sort().implode() for col in enum_cols
+                ]).row(0)
+                for col, values in zip(enum_cols, categories):
+                    exprs.append(pl.col(col).cast(pl.Enum(values)))
+                    optimizations.append({
+                        'column': col,
+                        'optimization': 'string_to_enum',
+                        'unique_values': stats[(col, 'n_unique')]
+                    })
+
+            # 3. Downcast numeric types
+            for col in int_cols:
+                min_val = stats[(col, 'min')]
+                max_val = stats[(col, 'max')]
+                if min_val is None or max_val is None:
+                    continue
+
+                downcast = next(
+                    (d for d in INT_DOWNCASTS if d[0] <= min_val and max_val <= d[1]),
+                    None
+                )
+                if downcast is None:
+                    continue
+                _, _, target, name = downcast
+
+                exprs.append(pl.col(col).cast(target))
+                optimizations.append({
+                    'column': col,
+                    'optimization': name,
+                    'range': f"{min_val}-{max_val}"
+                })
+
+            for col in float_cols:
+                if col in key_set:
+                    continue
+                abs_max = stats[(col, 'abs_max')]
+                if abs_max is None or abs_max <= FLOAT32_MAX:
+                    exprs.append(pl.col(col).cast(pl.Float32))
                     optimizations.append({
                         'column': col,
                         'optimization': 'float64_to_float32'
                     })
 
-            # 3. Table-specific optimizations
-            if table_type == 'fact':
-                # Ensure fact tables have integer keys
-                key_columns = [c for c in optimized_df.columns if c.endswith('_key') or c.endswith('_id')]
-                for col in key_columns:
-                    if optimized_df[col].dtype not in [pl.Int8, pl.Int16, pl.Int32, pl.Int64,
-                                                        pl.UInt8, pl.UInt16, pl.UInt32, pl.UInt64]:
-                        try:
-                            optimized_df = optimized_df.with_columns(
-                                pl.col(col).cast(pl.Int32)
-                            )
-                            optimizations.append({
-                                'column': col,
-                                'optimization': 'key_to_integer'
-                            })
-                        except:
-                            pass
-
-            elif table_type == 'dimension':
-                # Ensure dimension tables have a proper key column
-                pass
-
-            # Calculate size reduction
+            # Calculate size reduction; with nothing to cast the input is returned as is
             original_size = df.estimated_size()
-            optimized_size = optimized_df.estimated_size()
-            reduction_pct = (1 - optimized_size / original_size) * 100 if original_size > 0 else 0
-
-            return {
+            result = {
                 'success': True,
-                'optimized_df': optimized_df,
                 'optimizations_applied': optimizations,
                 'original_size_bytes': original_size,
-                'optimized_size_bytes': optimized_size,
-                'size_reduction_pct': round(reduction_pct, 1),
-                'column_count': len(optimized_df.columns),
-                'row_count': len(optimized_df)
+                'column_count': len(schema),
+                'row_count': total_count
             }
 
+            if return_lazy:
+                # Leave the casts unexecuted so a sink can fuse them with the write
+                result['optimized_lf'] = df.lazy().with_columns(exprs)
+                sample = df.head(LAZY_SIZE_SAMPLE_ROWS)
+                sample_size = sample.estimated_size()
+                if exprs and sample_size > 0:
+                    ratio = sample.with_columns(exprs).estimated_size() / sample_size
+                    optimized_size = int(original_size * ratio)
+                else:
+                    optimized_size = original_size
+            elif exprs:
+                # Apply all casts in a single pass
+                optimized_df = df.lazy().with_columns(exprs).collect()
+                optimized_size = optimized_df.estimated_size()
+                result['optimized_df'] = optimized_df
+            else:
+                optimized_size = original_size
+                result['optimized_df'] = df
+
+            reduction_pct = (1 - optimized_size / original_size) * 100 if original_size > 0 else 0
+            result['optimized_size_bytes'] = optimized_size
+            result['size_reduction_pct'] = round(reduction_pct, 1)
+            return result
+
         except Exception as e:
             logger.error(f"Error optimizing for Power BI: {e}", exc_info=True)
             return {'success': False, 'error': str(e)}
@@ -159,43 +230,52 @@ class PowerBIOptimizer:
             # Find potential key columns
             table_keys = {}
             for name, df in dataframes.items():
-                keys = []
-                for col in df.columns:
-                    col_lower = col.lower()
-                    if col_lower.endswith('_key') or col_lower.endswith('_id') or col_lower == 'id':
-                        keys.append({
-                            'column': col,
-                            'unique_count': df[col].n_unique(),
-                            'is_unique': df[col].n_unique() == len(df)
-                        })
-                table_keys[name] = keys
+                key_cols = [col for col in df.schema if KEY_COLUMN_RE.search(col)]
+
+                # Distinct counts for all key columns in one pass
+                unique_counts = df.select(
+                    [pl.col(c).n_unique() for c in key_cols]
+                ).row(0) if key_cols else ()
+                row_count = len(df)
+                table_keys[name] = [
+                    {
+                        'column': col,
+                        'unique_count': unique_count,
+                        'is_unique': unique_count == row_count
+                    }
+                    for col, unique_count in zip(key_cols, unique_counts)
+                ]
+
+            # Bucket key columns by their base name so only matching columns are paired
+            buckets = defaultdict(list)
+            for name, keys in table_keys.items():
+                for key in keys:
+                    buckets[_normalize_column_name(key['column'])].append((name, key))
 
             # Find matching keys between tables
-            table_names = list(dataframes.keys())
-            for i, table1 in enumerate(table_names):
-                for table2 in table_names[i+1:]:
-                    for key1 in table_keys[table1]:
-                        for key2 in table_keys[table2]:
-                            # Check if column names suggest a relationship
-                            if self._columns_match(key1['column'], key2['column']):
-                                # Determine relationship type
-                                if key1['is_unique'] and key2['is_unique']:
-                                    rel_type = '1:1'
-                                elif key1['is_unique']:
-                                    rel_type = '1:*'
-                                elif key2['is_unique']:
-                                    rel_type = '*:1'
-                                else:
-                                    rel_type = '*:*'
-
-                                suggestions.append({
-                                    'from_table': table1,
-                                    'from_column': key1['column'],
-                                    'to_table': table2,
-                                    'to_column': key2['column'],
-                                    'relationship_type': rel_type,
-                                    'confidence': 'high' if key1['column'] == key2['column'] else 'medium'
-                                })
+            for entries in buckets.values():
+                for (table1, key1), (table2, key2) in combinations(entries, 2):
+                    if table1 == table2:
+                        continue
+
+                    # Determine relationship type
+                    if key1['is_unique'] and key2['is_unique']:
+                        rel_type = '1:1'
+                    elif key1['is_unique']:
+                        rel_type = '1:*'
+                    elif key2['is_unique']:
+                        rel_type = '*:1'
+                    else:
+                        rel_type = '*:*'
+
+                    suggestions.append({
+                        'from_table': table1,
+                        'from_column': key1['column'],
+                        'to_table': table2,
+                        'to_column': key2['column'],
+                        'relationship_type': rel_type,
+                        'confidence': 'high' if key1['column'] == key2['column'] else 'medium'
+                    })
 
             return {
                 'success': True,
@@ -212,27 +292,7 @@ class PowerBIOptimizer:
 
     def _columns_match(self, col1: str, col2: str) -> bool:
         """Check if two column names suggest a relationship"""
-        col1_lower = col1.lower()
-        col2_lower = col2.lower()
-
-        # Exact match
-        if col1_lower == col2_lower:
-            return True
-
-        # Common patterns
-        patterns = [
-            ('_key', '_key'),
-            ('_id', '_id'),
-            ('id', 'key')
-        ]
-
-        for p1, p2 in patterns:
-            base1 = col1_lower.replace(p1, '').replace(p2, '')
-            base2 = col2_lower.replace(p1, '').replace(p2, '')
-            if base1 == base2 and base1:
-                return True
-
-        return False
+        return _normalize_column_name(col1) == _normalize_column_name(col2)
 
     def generate_dax_measures(
         self,
@@ -245,15 +305,13 @@ class PowerBIOptimizer:
 
             # Find numeric columns
             numeric_cols = [
-                col for col in df.columns
-                if df[col].dtype in [pl.Int8, pl.Int16, pl.Int32, pl.Int64,
-                                      pl.UInt8, pl.UInt16, pl.UInt32, pl.UInt64,
-                                      pl.Float32, pl.Float64]
+                col for col, dtype in df.schema.items()
+                if dtype in NUMERIC_DTYPES
             ]
 
             # Generate SUM measures for numeric columns
             for col in numeric_cols:
-                if not col.lower().endswith('_key') and not col.lower().endswith('_id'):
+                if not KEY_COLUMN_RE.search(col):
                     measures.append({
                         'name': f"Total {col.replace('_', ' ').title()}",
                         'expression': f"SUM('{table_name}'[{col}])",
@@ -268,7 +326,7 @@ class PowerBIOptimizer:
             })
 
             # Generate DISTINCTCOUNT for key columns
-            key_cols = [c for c in df.columns if c.lower().endswith('_key') or c.lower().endswith('_id')]
+            key_cols = [c for c in df.columns if KEY_COLUMN_RE.search(c)]
             for col in key_cols:
                 measures.append({
                     'name': f"Distinct {col.replace('_', ' ').title()}",
@@ -9,16 +9,278 @@ Supports:
 - Copula-based multivariate correlations
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from typing import Dict, List, Any, Optional, Tuple, Union, Callable
 from enum import Enum
+from functools import lru_cache
+import ast
+import keyword
 import math
+import operator
+import os
 import random
+import re
+import logging
 from datetime import date, datetime
 
 import polars as pl
 import numpy as np
 
+logger = logging.getLogger(__name__)
+
+
+# Parameter dicts whose normalized distributions are kept per engine
+DISTRIBUTION_CACHE_SIZE = 256
+
+# Categorical groups smaller than this sample with random.choices instead of NumPy
+SMALL_GROUP_ROWS = 16
+
+# Rows per block for numeric kernels (~1 MB of float64, sized for L2)
+BLOCK_ROWS = 131072
+MAX_BLOCK_WORKERS = 8
+
+# Largest magnitude float32 holds exactly at unit resolution; int32 range for tier outputs
+FLOAT32_EXACT_LIMIT = 2 ** 24
+INT32_MIN, INT32_MAX = -(2 ** 31), 2 ** 31 - 1
+
+_BIN_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+# Globals for row-wise condition evaluation: no builtins beyond these helpers
+_CONDITION_GLOBALS = {'__builtins__': {}, 'abs': abs, 'round': round, 'min': min, 'max': max}
+
+_CMP_OPS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+}
+
+
+def _as_expr(value: Any) -> pl.Expr:
+    """Wrap a scalar in pl.lit so it can be combined with expressions"""
+    return value if isinstance(value, pl.Expr) else pl.lit(value)
+
+
+def _compare(op: ast.cmpop, left: Any, right: Any) -> Any:
+    """Translate a single comparison, treating None like Python does"""
+    if isinstance(op, (ast.In, ast.NotIn)):
+        if not isinstance(left, pl.Expr) or not isinstance(right, (list, tuple)):
+            raise ValueError("'in' requires a column on the left and a literal list on the right")
+        result = left.is_in(list(right))
+        return ~result if isinstance(op, ast.NotIn) else result
+    if isinstance(op, (ast.Eq, ast.Is, ast.NotEq, ast.IsNot)) and (left is None or right is None):
+        operand = right if left is None else left
+        is_equal = isinstance(op, (ast.Eq, ast.Is))
+        if not isinstance(operand, pl.Expr):
+            return (operand is None) == is_equal
+        return operand.is_null() if is_equal else operand.is_not_null()
+    if type(op) not in _CMP_OPS:
+        raise ValueError(f"Unsupported comparison: {type(op).__name__}")
+    return _CMP_OPS[type(op)](left, right)
+
+
+def _ast_to_expr(node: ast.AST, columns: Dict[str, str]) -> Any:
+    """Translate a parsed Python expression into a Polars expression.
+
+    Names are resolved through ``columns`` (identifier -> column name) into
+    pl.col references; literals stay Python values so constant
+    sub-expressions fold before any Polars node is built.
+    """
+    if isinstance(node, ast.Expression):
+        return _ast_to_expr(node.body, columns)
+    if isinstance(node, ast.Name):
+        if node.id in columns:
+            return pl.col(columns[node.id])
+        raise ValueError(f"Unknown column '{node.id}'")
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, (ast.List, ast.Tuple)):
+        return [_ast_to_expr(elt, columns) for elt in node.elts]
+    if isinstance(node, ast.BinOp) and type(node.op) in _BIN_OPS:
+        return _BIN_OPS[type(node.op)](_ast_to_expr(node.left, columns), _ast_to_expr(node.right, columns))
+    if isinstance(node, ast.UnaryOp):
+        operand = _ast_to_expr(node.operand, columns)
+        if isinstance(node.op, ast.Not):
+            return ~operand if isinstance(operand, pl.Expr) else not operand
+        if isinstance(node.op, ast.USub):
+            return -operand
+        if isinstance(node.op, ast.UAdd):
+            return operand
+    if isinstance(node, ast.BoolOp):
+        values = [_as_expr(_ast_to_expr(v, columns)) for v in node.values]
+        combine = operator.and_ if isinstance(node.op, ast.And) else operator.or_
+        result = values[0]
+        for value in values[1:]:
+            result = combine(result, value)
+        return result
+    if isinstance(node, ast.Compare):
+        left = _ast_to_expr(node.left, columns)
+        result = None
+        for op, comparator in zip(node.ops, node.comparators):
+            right = _ast_to_expr(comparator, columns)
+            part = _compare(op, left, right)
+            result = part if result is None else _as_expr(result) & _as_expr(part)
+            left = right
+        return result
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in ('abs', 'round'):
+        args = [_ast_to_expr(a, columns) for a in node.args]
+        if node.func.id == 'abs':
+            return args[0].abs() if isinstance(args[0], pl.Expr) else abs(args[0])
+        if isinstance(args[0], pl.Expr):
+            return args[0].round(args[1] if len(args) > 1 else 0)
+        return round(*args)
+    raise ValueError(f"Unsupported syntax: {type(node).__name__}")
+
+
+def _ast_to_array(node: ast.AST, columns: Dict[str, str], df: pl.DataFrame) -> Any:
+    """Evaluate a parsed arithmetic expression over whole NumPy columns"""
+    if isinstance(node, ast.Expression):
+        return _ast_to_array(node.body, columns, df)
+    if isinstance(node, ast.Name):
+        if node.id in columns:
+            return df[columns[node.id]].cast(pl.Float64).to_numpy()
+        raise ValueError(f"Unknown column '{node.id}'")
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _BIN_OPS:
+        return _BIN_OPS[type(node.op)](_ast_to_array(node.left, columns, df), _ast_to_array(node.right, columns, df))
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        operand = _ast_to_array(node.operand, columns, df)
+        return -operand if isinstance(node.op, ast.USub) else operand
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in ('abs', 'round'):
+        args = [_ast_to_array(a, columns, df) for a in node.args]
+        if node.func.id == 'abs':
+            return np.abs(args[0])
+        return np.round(args[0], int(args[1]) if len(args) > 1 else 0)
+    raise ValueError(f"Unsupported syntax: {type(node).__name__}")
+
+
+@lru_cache(maxsize=64)
+def _placeholder_pattern(awkward: Tuple[str, ...]) -> Tuple[re.Pattern, Dict[str, str]]:
+    """One alternation regex over non-identifier column names, longest first"""
+    ordered = sorted(awkward, key=len, reverse=True)
+    pattern = re.compile(r'(?<!\w)(' + '|'.join(re.escape(col) for col in ordered) + r')(?!\w)')
+    return pattern, {col: f'__col_{i}__' for i, col in enumerate(ordered)}
+
+
+@lru_cache(maxsize=256)
+def _parse_expression(source: str, columns: Tuple[str, ...]) -> Tuple[ast.Expression, Dict[str, str]]:
+    """Parse a formula or condition string, mapping its identifiers to columns"""
+    names = {col: col for col in columns if col.isidentifier() and not keyword.iskeyword(col)}
+
+    # Identifiers are resolved by the tokenizer inside ast.parse; only columns that
+    # are not valid identifiers and actually occur in the text need a regex pass
+    awkward = tuple(col for col in columns if col not in names and col in source)
+    if awkward:
+        pattern, placeholders = _placeholder_pattern(awkward)
+        source = pattern.sub(lambda m: placeholders[m.group(1)], source)
+        names.update({placeholder: col for col, placeholder in placeholders.items()})
+
+    return ast.parse(source.strip(), mode='eval'), names
+
+
+@lru_cache(maxsize=256)
+def _compile_expression(source: str, columns: Tuple[str, ...]) -> pl.Expr:
+    """Compile a formula or condition string into a reusable Polars expression"""
+    tree, names = _parse_expression(source, columns)
+    return _as_expr(_ast_to_expr(tree, names))
+
+
+def _nearest_correlation(matrix: np.ndarray, min_eigenvalue: float = 1e-8) -> np.ndarray:
+    """Project a symmetric matrix onto a positive-definite correlation matrix"""
+    eigenvalues, eigenvectors = np.linalg.eigh(matrix)
+    if eigenvalues.min() >= min_eigenvalue:
+        return matrix
+    clipped = (eigenvectors * np.maximum(eigenvalues, min_eigenvalue)) @ eigenvectors.T
+    scale = np.sqrt(np.diag(clipped))
+    return clipped / np.outer(scale, scale)
+
+
+def _normalize_distribution(dist: Dict[Any, float]) -> Tuple[List[Any], np.ndarray]:
+    """Split a {value: weight} mapping into options and probabilities summing to 1"""
+    options = list(dist.keys())
+    weights = np.asarray(list(dist.values()), dtype=np.float64)
+    return options, weights / weights.sum()
+
+
+def _bound_and_round(block: np.ndarray, min_value: Any, max_value: Any, round_to: Optional[int]) -> None:
+    """Clamp and round a block of values in place"""
+    if min_value is not None:
+        np.maximum(block, min_value, out=block)
+    if max_value is not None:
+        np.minimum(block, max_value, out=block)
+    if round_to is not None:
+        np.round(block, round_to, out=block)
+
+
+def _run_blocks(n: int, kernel: Callable[[int, int], None]) -> None:
+    """Run kernel(start, stop) over cache-sized row blocks, in parallel when there are several"""
+    bounds = [(start, min(start + BLOCK_ROWS, n)) for start in range(0, n, BLOCK_ROWS)]
+    if len(bounds) <= 1:
+        for start, stop in bounds:
+            kernel(start, stop)
+        return
+
+    # NumPy releases the GIL inside its kernels, so threads scale across cores
+    workers = min(MAX_BLOCK_WORKERS, len(bounds), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda bound: kernel(*bound), bounds))
+
+
+def _numeric_output(name: str, values: np.ndarray, params: Dict[str, Any]) -> pl.Series:
+    """Wrap a float64 kernel result, narrowing to float32 only when the rule opts in.
+
+    Outputs stay Float64 unless the rule sets dtype. 'float32' always narrows;
+    'auto' narrows only when round_to <= 4 and every rounded value stays below
+    2**24 units of its last decimal, so no two distinct rounded values merge.
+    """
+    dtype = params.get('dtype')
+    round_to = params.get('round_to')
+    if dtype == 'float32':
+        return pl.Series(name, values.astype(np.float32))
+    if dtype == 'auto' and round_to is not None and 0 <= round_to <= 4 and values.size:
+        if np.abs(values).max() * 10 ** round_to < FLOAT32_EXACT_LIMIT:
+            return pl.Series(name, values.astype(np.float32))
+    return pl.Series(name, values)
+
+
+def _table_dtype(values: List[Any], params: Dict[str, Any]) -> Optional[pl.DataType]:
+    """Int32 for lookup tables of small integers when the rule sets dtype 'auto', else inferred"""
+    if params.get('dtype') != 'auto':
+        return None
+    present = [v for v in values if v is not None]
+    if present and all(type(v) is int and INT32_MIN <= v <= INT32_MAX for v in present):
+        return pl.Int32
+    return None
+
+
+def _copula_marginal(z: np.ndarray, params: Dict[str, Any]) -> np.ndarray:
+    """Map standard normal draws onto a copula rule's target distribution, in place"""
+    mean = params.get('mean', 100)
+    std = params.get('std', 20)
+    if params.get('distribution', 'normal') == 'lognormal':
+        z *= std / mean
+        z += np.log(mean)
+        return np.exp(z, out=z)
+    z *= std
+    z += mean
+    return z
+
+
+# A rule's output column: a named Polars expression or a materialized Series
+ColumnResult = Union[pl.Expr, pl.Series]
+
 
 class CorrelationType(Enum):
     """Types of correlation relationships"""
@@ -39,11 +301,12 @@ class CorrelationRule:
     target_column: str
     parameters: Dict[str, Any] = field(default_factory=dict)
     description: str = ""
+    _compiled: Any = field(default=None, repr=False, compare=False)  # Prepared lookup state
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'CorrelationRule':
         """Create rule from dictionary"""
-        return cls(
+        rule = cls(
             name=data.get('name', 'unnamed'),
             correlation_type=CorrelationType(data.get('type', 'formula')),
             source_columns=data.get('source_columns', []),
@@ -51,6 +314,12 @@ class CorrelationRule:
             parameters=data.get('parameters', {}),
             description=data.get('description', '')
         )
+        if rule.correlation_type == CorrelationType.TIERED:
+            try:
+                rule._compiled = CompiledTiers.from_parameters(rule.parameters)
+            except (TypeError, ValueError):
+                pass  # Malformed tiers are reported when the rule is applied
+        return rule
 
 
 @dataclass
@@ -62,34 +331,164 @@ class TierDefinition:
     output_distribution: Optional[Dict[Any, float]] = None  # For probabilistic outputs
 
 
+@dataclass
+class CompiledTiers:
+    """Tier ranges and outputs prepared once per rule for vectorized lookup"""
+    mins: np.ndarray
+    maxs: np.ndarray
+    edges: Optional[np.ndarray]  # Set when tiers are sorted and contiguous
+    table: pl.Series  # Per-tier values, the default, then every distribution's options
+    distributions: List[Optional[Tuple[int, np.ndarray]]]  # (table offset, probabilities)
+
+    @classmethod
+    def from_parameters(cls, params: Dict[str, Any]) -> 'CompiledTiers':
+        """Build the lookup state from tier definitions"""
+        tiers = params.get('tiers', [])
+        default_value = params.get('default')
+
+        mins = np.array([tier.get('min', float('-inf')) for tier in tiers], dtype=float)
+        maxs = np.array([tier.get('max', float('inf')) for tier in tiers], dtype=float)
+        edges = None
+        if len(tiers) and np.all(mins < maxs) and np.array_equal(mins[1:], maxs[:-1]):
+            edges = np.append(mins, maxs[-1])
+
+        values = [tier.get('value', default_value) for tier in tiers] + [default_value]
+        distributions = []
+        for tier in tiers:
+            if 'distribution' not in tier:
+                distributions.append(None)
+                continue
+            options, probabilities = _normalize_distribution(tier['distribution'])
+            distributions.append((len(values), probabilities))
+            values.extend(options)
+
+        table = pl.Series(values, dtype=_table_dtype(values, params), strict=False)
+        return cls(mins=mins, maxs=maxs, edges=edges, table=table, distributions=distributions)
+
+
 class CorrelationEngine:
     """Engine for generating correlated data"""
 
     def __init__(self, seed: Optional[int] = None):
         """Initialize engine with optional seed"""
         self.seed = seed
-        if seed is not None:
-            random.seed(seed)
-            np.random.seed(seed)
+        self.rng = np.random.default_rng(seed)
+        self._py_rng = random.Random(seed)
+        self._distribution_cache: Dict[int, Tuple[Dict[str, Any], Any]] = {}
 
     def apply_correlations(
         self,
         df: pl.DataFrame,
         rules: List[CorrelationRule]
     ) -> pl.DataFrame:
-        """Apply multiple correlation rules to a DataFrame"""
-        result_df = df.clone()
+        """
+        Apply multiple correlation rules to a DataFrame.
+
+        Rules are collected into waves of independent column expressions and
+        each wave is added in one with_columns pass. A wave is flushed as soon
+        as a rule reads or rewrites a column produced earlier in the same wave.
+        """
+        result_df = df
+        wave: List[Tuple[CorrelationRule, ColumnResult]] = []
+        joint_columns = self._sample_joint_copulas(rules, len(df))
 
         for rule in rules:
+            if any(self._rule_touches(rule, pending.target_column) for pending, _ in wave):
+                result_df = self._flush_wave(result_df, wave)
+                wave = []
             try:
-                result_df = self._apply_rule(result_df, rule)
+                column = joint_columns.get(id(rule))
+                if column is None:
+                    column = self._apply_rule(result_df, rule)
             except Exception as e:
-                print(f"Warning: Failed to apply rule '{rule.name}': {e}")
+                logger.warning(f"Failed to apply rule '{rule.name}': {e}")
+                continue
+            if column is not None:
+                wave.append((rule, column))
 
-        return result_df
+        return self._flush_wave(result_df, wave)
 
-    def _apply_rule(self, df: pl.DataFrame, rule: CorrelationRule) -> pl.DataFrame:
-        """Apply a single correlation rule"""
+    def _sample_joint_copulas(self, rules: List[CorrelationRule], n: int) -> Dict[int, pl.Series]:
+        """
+        Draw source-free copula targets that declare target_correlations jointly.
+
+        Copula rules without source correlations may correlate with each other
+        through {'target_correlations': {other_target: r}}. Every linked target
+        comes from one Cholesky-factored multivariate normal draw; the result
+        maps id(rule) to its column.
+        """
+        free = {
+            rule.target_column: rule for rule in rules
+            if rule.correlation_type == CorrelationType.COPULA and not rule.parameters.get('correlations')
+        }
+        links = [
+            (rule.target_column, other, r)
+            for rule in free.values()
+            for other, r in rule.parameters.get('target_correlations', {}).items()
+            if other in free and other != rule.target_column
+        ]
+        if not links:
+            return {}
+
+        targets = list(dict.fromkeys(t for a, b, _ in links for t in (a, b)))
+        position = {target: i for i, target in enumerate(targets)}
+        corr_matrix = np.eye(len(targets))
+        for a, b, r in links:
+            corr_matrix[position[a], position[b]] = corr_matrix[position[b], position[a]] = r
+
+        try:
+            chol = np.linalg.cholesky(_nearest_correlation(corr_matrix))
+        except np.linalg.LinAlgError as e:
+            logger.warning(f"Failed to sample joint copula targets: {e}")
+            return {}
+        joint = self.rng.standard_normal((n, len(targets))) @ chol.T
+
+        columns = {}
+        for target, i in position.items():
+            rule = free[target]
+            params = rule.parameters
+            values = _copula_marginal(np.ascontiguousarray(joint[:, i]), params)
+            _bound_and_round(values, params.get('min_value'), params.get('max_value'), params.get('round_to'))
+            columns[id(rule)] = _numeric_output(target, values, params)
+        return columns
+
+    def _flush_wave(
+        self,
+        df: pl.DataFrame,
+        wave: List[Tuple[CorrelationRule, ColumnResult]]
+    ) -> pl.DataFrame:
+        """Add a wave of rule outputs, falling back to one rule at a time on error"""
+        if not wave:
+            return df
+        try:
+            return df.lazy().with_columns([column for _, column in wave]).collect()
+        except Exception:
+            pass
+
+        for rule, column in wave:
+            try:
+                df = df.with_columns(column)
+            except Exception:
+                try:
+                    df = df.with_columns(self._apply_rule_fallback(df, rule))
+                except Exception as e:
+                    logger.warning(f"Failed to apply rule '{rule.name}': {e}")
+        return df
+
+    def _rule_touches(self, rule: CorrelationRule, column: str) -> bool:
+        """Check whether a rule reads or writes the given column"""
+        params = rule.parameters
+        if column == rule.target_column or column in rule.source_columns:
+            return True
+        if column in params.get('correlations', {}):
+            return True
+        # Formula and condition strings are matched conservatively by substring
+        texts = [params.get('formula', '')]
+        texts.extend(cond.get('condition', '') for cond in params.get('conditions', []))
+        return any(column in text for text in texts if isinstance(text, str))
+
+    def _apply_rule(self, df: pl.DataFrame, rule: CorrelationRule) -> Optional[ColumnResult]:
+        """Build the output column for a single correlation rule"""
         if rule.correlation_type == CorrelationType.STATISTICAL:
             return self._apply_statistical(df, rule)
         elif rule.correlation_type == CorrelationType.CATEGORICAL:
@@ -103,9 +502,17 @@ class CorrelationEngine:
         elif rule.correlation_type == CorrelationType.COPULA:
             return self._apply_copula(df, rule)
         else:
-            return df
+            return None
 
-    def _apply_statistical(self, df: pl.DataFrame, rule: CorrelationRule) -> pl.DataFrame:
+    def _apply_rule_fallback(self, df: pl.DataFrame, rule: CorrelationRule) -> ColumnResult:
+        """Row-by-row evaluation for rules whose expression failed at execution"""
+        if rule.correlation_type == CorrelationType.FORMULA:
+            return self._apply_formula_fallback(df, rule)
+        elif rule.correlation_type == CorrelationType.CONDITIONAL:
+            return self._apply_conditional_fallback(df, rule)
+        raise ValueError(f"No fallback for {rule.correlation_type.value} rules")
+
+    def _apply_statistical(self, df: pl.DataFrame, rule: CorrelationRule) -> ColumnResult:
         """Apply statistical correlation (generate correlated random values)"""
         source_col = rule.source_columns[0]
         target_col = rule.target_column
@@ -119,38 +526,34 @@ class CorrelationEngine:
         max_value = params.get('max_value')
 
         # Normalize source column
-        source_values = np.array(df[source_col].to_list())
+        source_values = df[source_col].to_numpy()
         source_mean = np.mean(source_values)
         source_std = np.std(source_values)
 
         if source_std == 0:
             source_std = 1
 
-        normalized_source = (source_values - source_mean) / source_std
-
         # Generate correlated values using Cholesky decomposition
         n = len(df)
-        independent_noise = np.random.normal(0, 1, n)
-
-        # Correlated component
-        correlated = correlation * normalized_source + math.sqrt(1 - correlation**2) * independent_noise
-
-        # Scale to target distribution
-        target_values = target_mean + target_std * correlated
+        independent_noise = self.rng.standard_normal(n)
+        noise_scale = math.sqrt(1 - correlation**2)
+        target_values = np.empty(n, dtype=np.float64)
 
-        # Apply bounds
-        if min_value is not None:
-            target_values = np.maximum(target_values, min_value)
-        if max_value is not None:
-            target_values = np.minimum(target_values, max_value)
+        def kernel(start: int, stop: int) -> None:
+            # Correlated component, scaled to the target distribution in place
+            block = target_values[start:stop]
+            np.subtract(source_values[start:stop], source_mean, out=block)
+            block *= correlation / source_std
+            block += noise_scale * independent_noise[start:stop]
+            block *= target_std
+            block += target_mean
+            _bound_and_round(block, min_value, max_value, params.get('round_to'))
 
-        # Round if needed
-        if params.get('round_to') is not None:
-            target_values = np.round(target_values, params['round_to'])
+        _run_blocks(n, kernel)
 
-        return df.with_columns(pl.Series(name=target_col, values=target_values.tolist()))
+        return _numeric_output(target_col, target_values, params)
 
-    def _apply_categorical(self, df: pl.DataFrame, rule: CorrelationRule) -> pl.DataFrame:
+    def _apply_categorical(self, df: pl.DataFrame, rule: CorrelationRule) -> ColumnResult:
         """Apply categorical correlation (conditional distributions)"""
         source_col = rule.source_columns[0]
         target_col = rule.target_column
@@ -158,29 +561,57 @@ class CorrelationEngine:
 
         # Get conditional distributions
         # Format: {source_value: {target_value: probability, ...}, ...}
-        distributions = params.get('distributions', {})
-        default_distribution = params.get('default', {})
-
-        source_values = df[source_col].to_list()
-        target_values = []
+        distributions, default_distribution = self._prepared_distributions(params)
+
+        # Rows grouped by source value, so each distinct value samples once
+        groups = (
+            pl.DataFrame({'src': df[source_col]})
+            .with_row_index('row')
+            .group_by('src', maintain_order=True)
+            .agg(pl.col('row'))
+        )
 
-        for src_val in source_values:
-            # Get distribution for this source value
+        values = [None]
+        idx = np.zeros(len(df), dtype=np.int64)
+        for src_val, rows in groups.iter_rows():
             dist = distributions.get(str(src_val), distributions.get(src_val, default_distribution))
-
-            if dist:
-                options = list(dist.keys())
-                weights = list(dist.values())
-                # Normalize weights
-                total = sum(weights)
-                weights = [w / total for w in weights]
-                target_values.append(random.choices(options, weights=weights, k=1)[0])
+            if dist is None:
+                continue
+            options, probabilities, cum_weights = dist
+            if len(rows) < SMALL_GROUP_ROWS:
+                # NumPy's per-call setup dominates for a handful of draws
+                picks = np.array(self._py_rng.choices(range(len(options)), cum_weights=cum_weights, k=len(rows)))
             else:
-                target_values.append(None)
+                picks = self.rng.choice(len(options), size=len(rows), p=probabilities)
+            idx[np.asarray(rows, dtype=np.int64)] = len(values) + picks
+            values.extend(options)
+
+        return pl.Series(target_col, values, strict=False).gather(idx)
+
+    def _prepared_distributions(self, params: Dict[str, Any]) -> Tuple[Dict[Any, Any], Any]:
+        """Normalized categorical distributions, computed once per parameters dict.
+
+        Each entry is (options, probabilities, cumulative weights).
+        """
+        cached = self._distribution_cache.get(id(params))
+        if cached is not None and cached[0] is params:
+            return cached[1]
+
+        def prepare(dist):
+            if not dist:
+                return None
+            options, probabilities = _normalize_distribution(dist)
+            return options, probabilities, np.cumsum(probabilities).tolist()
 
-        return df.with_columns(pl.Series(name=target_col, values=target_values))
+        distributions = {key: prepare(dist) for key, dist in params.get('distributions', {}).items()}
+        prepared = (distributions, prepare(params.get('default')))
 
-    def _apply_formula(self, df: pl.DataFrame, rule: CorrelationRule) -> pl.DataFrame:
+        if len(self._distribution_cache) >= DISTRIBUTION_CACHE_SIZE:
+            self._distribution_cache.clear()
+        self._distribution_cache[id(params)] = (params, prepared)
+        return prepared
+
+    def _apply_formula(self, df: pl.DataFrame, rule: CorrelationRule) -> ColumnResult:
         """Apply formula-based calculation"""
         target_col = rule.target_column
         params = rule.parameters
@@ -193,14 +624,9 @@ class CorrelationEngine:
         try:
             # Build expression using Polars
             expr = self._parse_formula(formula, df.columns)
-            result_df = df.with_columns(expr.alias(target_col))
-
             if round_to is not None:
-                result_df = result_df.with_columns(
-                    pl.col(target_col).round(round_to)
-                )
-
-            return result_df
+                expr = expr.round(round_to)
+            return expr.alias(target_col)
 
         except Exception as e:
             # Fallback to row-by-row calculation
@@ -208,91 +634,116 @@ class CorrelationEngine:
 
     def _parse_formula(self, formula: str, columns: List[str]) -> pl.Expr:
         """Parse formula into Polars expression"""
-        # Replace column names with pl.col() references
-        expr_str = formula
-
-        # Sort columns by length (longest first) to avoid partial replacements
-        sorted_cols = sorted(columns, key=len, reverse=True)
-
-        for col in sorted_cols:
-            # Use word boundaries to avoid partial matches
-            import re
-            expr_str = re.sub(rf'\b{re.escape(col)}\b', f'pl.col("{col}")', expr_str)
-
-        # Evaluate the expression
-        expr = eval(expr_str)
-        return expr
+        return _compile_expression(formula, tuple(columns))
 
-    def _apply_formula_fallback(self, df: pl.DataFrame, rule: CorrelationRule) -> pl.DataFrame:
-        """Fallback formula application using row-by-row calculation"""
+    def _apply_formula_fallback(self, df: pl.DataFrame, rule: CorrelationRule) -> ColumnResult:
+        """Fallback formula application evaluated with NumPy over whole columns"""
         target_col = rule.target_column
         params = rule.parameters
         formula = params.get('formula', '')
         round_to = params.get('round_to')
 
-        # Convert to list of dicts for row-by-row processing
-        rows = df.to_dicts()
-        results = []
-
-        for row in rows:
-            try:
-                # Replace column names with values
-                expr = formula
-                for col, val in row.items():
-                    if val is not None:
-                        expr = expr.replace(col, str(val))
-                result = eval(expr)
+        # Evaluate the formula once over float64 columns; failures yield nulls
+        try:
+            tree, names = _parse_expression(formula, tuple(df.columns))
+            with np.errstate(all='ignore'):
+                values = np.asarray(_ast_to_array(tree, names, df), dtype=np.float64)
+                values = np.broadcast_to(values, (len(df),))
+                values = np.where(np.isfinite(values), values, np.nan)
                 if round_to is not None:
-                    result = round(result, round_to)
-                results.append(result)
-            except Exception:
-                results.append(None)
+                    values = np.round(values, round_to)
+        except Exception:
+            return pl.Series(target_col, [None] * len(df))
 
-        return df.with_columns(pl.Series(name=target_col, values=results))
+        return pl.Series(target_col, values, nan_to_null=True)
 
-    def _apply_tiered(self, df: pl.DataFrame, rule: CorrelationRule) -> pl.DataFrame:
+    def _apply_tiered(self, df: pl.DataFrame, rule: CorrelationRule) -> ColumnResult:
         """Apply tiered correlation (range-based mapping)"""
         source_col = rule.source_columns[0]
         target_col = rule.target_column
         params = rule.parameters
 
-        # Get tier definitions
+        # Tier definitions are compiled once per rule
         # Format: [{min: 0, max: 10, value: 0.0}, {min: 10, max: 50, value: 0.05}, ...]
-        tiers = params.get('tiers', [])
-        default_value = params.get('default')
-
-        source_values = df[source_col].to_list()
-        target_values = []
-
-        for src_val in source_values:
-            if src_val is None:
-                target_values.append(default_value)
+        if rule._compiled is None:
+            rule._compiled = CompiledTiers.from_parameters(params)
+        tiers = rule._compiled
+        tier_count = len(tiers.mins)
+
+        source = df[source_col]
+        src = source.cast(pl.Float64).to_numpy()
+        unassigned = ~source.is_null().to_numpy()
+
+        # Index into the output table per row; the slot after the tiers holds the default
+        idx = np.full(len(df), tier_count, dtype=np.int64)
+
+        if tiers.edges is not None:
+            # Sorted, contiguous tiers: one binary search over the edges
+            pos = np.searchsorted(tiers.edges, src, side='right') - 1
+            hit = unassigned & (pos >= 0) & (pos < tier_count)
+            idx[hit] = pos[hit]
+        else:
+            # Arbitrary ranges: first matching tier wins, as in the definition order
+            for i, (lo, hi) in enumerate(zip(tiers.mins, tiers.maxs)):
+                hit = unassigned & (src >= lo) & (src < hi)
+                idx[hit] = i
+                unassigned &= ~hit
+
+        # Probabilistic tiers point their rows at sampled options in the table
+        for i, dist in enumerate(tiers.distributions):
+            if dist is None:
+                continue
+            rows = np.flatnonzero(idx == i)
+            if rows.size == 0:
                 continue
+            offset, probabilities = dist
+            idx[rows] = offset + self.rng.choice(len(probabilities), size=rows.size, p=probabilities)
 
-            matched = False
-            for tier in tiers:
-                min_val = tier.get('min', float('-inf'))
-                max_val = tier.get('max', float('inf'))
-
-                if min_val <= src_val < max_val:
-                    # Check for probabilistic output
-                    if 'distribution' in tier:
-                        dist = tier['distribution']
-                        options = list(dist.keys())
-                        weights = list(dist.values())
-                        target_values.append(random.choices(options, weights=weights, k=1)[0])
-                    else:
-                        target_values.append(tier.get('value', default_value))
-                    matched = True
-                    break
+        return tiers.table.gather(idx).alias(target_col)
 
-            if not matched:
-                target_values.append(default_value)
+    def _apply_conditional(self, df: pl.DataFrame, rule: CorrelationRule) -> ColumnResult:
+        """Apply conditional rules (if-then logic) as one when/then/otherwise chain"""
+        target_col = rule.target_column
+        params = rule.parameters
 
-        return df.with_columns(pl.Series(name=target_col, values=target_values))
+        # Get conditions
+        # Format: [{condition: "column1 > 100 and column2 == 'A'", value: 10}, ...]
+        conditions = params.get('conditions', [])
+        default_value = params.get('default')
+        n = len(df)
 
-    def _apply_conditional(self, df: pl.DataFrame, rule: CorrelationRule) -> pl.DataFrame:
-        """Apply conditional rules (if-then logic)"""
+        try:
+            branches = []
+            for cond in conditions:
+                predicate = self._parse_condition(cond.get('condition', ''), df.columns)
+                if 'distribution' in cond:
+                    value = self._sample_distribution(cond['distribution'], n)
+                else:
+                    value = pl.lit(cond.get('value', default_value))
+                branches.append((predicate, value))
+
+            # Fold in reverse so the first matching condition wins
+            expr = pl.lit(default_value)
+            for predicate, value in reversed(branches):
+                expr = pl.when(predicate).then(value).otherwise(expr)
+
+            return expr.alias(target_col)
+        except Exception:
+            return self._apply_conditional_fallback(df, rule)
+
+    def _parse_condition(self, condition: str, columns: List[str]) -> pl.Expr:
+        """Parse a Python-style condition string into a Polars boolean expression"""
+        # Null comparisons behave like False, as they did when evaluated per row
+        return _compile_expression(condition, tuple(columns)).fill_null(False)
+
+    def _sample_distribution(self, dist: Dict[Any, float], n: int) -> pl.Series:
+        """Draw n values from a {value: weight} distribution"""
+        options, probabilities = _normalize_distribution(dist)
+        picks = self.rng.choice(len(options), size=n, p=probabilities)
+        return pl.Series(options, strict=False).gather(picks)
+
+    def _apply_conditional_fallback(self, df: pl.DataFrame, rule: CorrelationRule) -> ColumnResult:
+        """Fallback conditional application using row-by-row evaluation"""
         target_col = rule.target_column
         params = rule.parameters
 
@@ -301,34 +752,32 @@ class CorrelationEngine:
         conditions = params.get('conditions', [])
         default_value = params.get('default')
 
-        rows = df.to_dicts()
-        results = []
+        # Compile each condition once; rows are then evaluated against their own values
+        compiled = []
+        names: Dict[str, str] = {}
+        for cond in conditions:
+            try:
+                tree, cond_names = _parse_expression(cond.get('condition', ''), tuple(df.columns))
+                code = compile(tree, '<condition>', 'eval')
+            except (SyntaxError, ValueError):
+                continue
+            names.update(cond_names)
+            dist = _normalize_distribution(cond['distribution']) if 'distribution' in cond else None
+            compiled.append((code, dist, cond.get('value', default_value)))
 
-        for row in rows:
+        results = []
+        for row in df.iter_rows(named=True):
+            scope = {name: row[col] for name, col in names.items()}
             matched = False
-            for cond in conditions:
-                condition_str = cond.get('condition', '')
-
-                # Replace column names with values
-                eval_condition = condition_str
-                for col, val in row.items():
-                    if isinstance(val, str):
-                        eval_condition = eval_condition.replace(col, f'"{val}"')
-                    elif val is None:
-                        eval_condition = eval_condition.replace(col, 'None')
-                    else:
-                        eval_condition = eval_condition.replace(col, str(val))
-
+            for code, dist, value in compiled:
                 try:
-                    if eval(eval_condition):
+                    if eval(code, _CONDITION_GLOBALS, scope):
                         # Check for probabilistic output
-                        if 'distribution' in cond:
-                            dist = cond['distribution']
-                            options = list(dist.keys())
-                            weights = list(dist.values())
-                            results.append(random.choices(options, weights=weights, k=1)[0])
+                        if dist is not None:
+                            options, probabilities = dist
+                            results.append(options[self.rng.choice(len(options), p=probabilities)])
                         else:
-                            results.append(cond.get('value', default_value))
+                            results.append(value)
                         matched = True
                         break
                 except Exception:
@@ -337,9 +786,9 @@ class CorrelationEngine:
             if not matched:
                 results.append(default_value)
 
-        return df.with_columns(pl.Series(name=target_col, values=results))
+        return pl.Series(name=target_col, values=results)
 
-    def _apply_copula(self, df: pl.DataFrame, rule: CorrelationRule) -> pl.DataFrame:
+    def _apply_copula(self, df: pl.DataFrame, rule: CorrelationRule) -> ColumnResult:
         """Apply copula-based multivariate correlation"""
         target_col = rule.target_column
         params = rule.parameters
@@ -356,55 +805,51 @@ class CorrelationEngine:
 
         if not correlations:
             # No correlations specified, generate independent
-            if distribution == 'normal':
-                values = np.random.normal(target_mean, target_std, n)
-            elif distribution == 'lognormal':
-                values = np.random.lognormal(np.log(target_mean), target_std / target_mean, n)
-            else:
-                values = np.random.normal(target_mean, target_std, n)
+            values = _copula_marginal(self.rng.standard_normal(n), params)
+
+            def kernel(start: int, stop: int) -> None:
+                # Apply bounds and rounding
+                _bound_and_round(values[start:stop], min_value, max_value, params.get('round_to'))
         else:
             # Build correlation-based generation
             source_cols = list(correlations.keys())
             corr_values = list(correlations.values())
 
-            # Normalize source columns
-            normalized_sources = []
-            for col in source_cols:
-                source_values = np.array(df[col].to_list())
-                mean = np.mean(source_values)
-                std = np.std(source_values) or 1
-                normalized_sources.append((source_values - mean) / std)
-
-            # Weighted combination of sources
-            total_corr = sum(abs(c) for c in corr_values)
-            if total_corr > 1:
-                # Normalize correlations
-                corr_values = [c / total_corr for c in corr_values]
-                total_corr = 1
-
-            combined = np.zeros(n)
-            for norm_src, corr in zip(normalized_sources, corr_values):
-                combined += corr * norm_src
-
-            # Add independent noise
-            remaining_variance = max(0, 1 - sum(c**2 for c in corr_values))
-            if remaining_variance > 0:
-                combined += math.sqrt(remaining_variance) * np.random.normal(0, 1, n)
-
-            # Scale to target distribution
-            values = target_mean + target_std * combined
-
-        # Apply bounds
-        if min_value is not None:
-            values = np.maximum(values, min_value)
-        if max_value is not None:
-            values = np.minimum(values, max_value)
-
-        # Round if needed
-        if params.get('round_to') is not None:
-            values = np.round(values, params['round_to'])
-
-        return df.with_columns(pl.Series(name=target_col, values=values.tolist()))
+            sources = np.column_stack([df[col].to_numpy() for col in source_cols]).astype(np.float64, copy=False)
+            k = len(source_cols)
+
+            # Joint correlation matrix: observed source-source block plus requested target row
+            corr_matrix = np.eye(k + 1)
+            if k > 1:
+                corr_matrix[:k, :k] = np.nan_to_num(np.corrcoef(sources, rowvar=False))
+                np.fill_diagonal(corr_matrix, 1.0)
+            corr_matrix[k, :k] = corr_matrix[:k, k] = corr_values
+            chol = np.linalg.cholesky(_nearest_correlation(corr_matrix))
+
+            # Target given sources: z @ beta + L[k, k] * noise, with beta = L_ss^-T L[k, :k]
+            beta = np.linalg.solve(chol[:k, :k].T, chol[k, :k])
+
+            # Fold each source's z-score scaling into its weight: one GEMV per block
+            stds = sources.std(axis=0)
+            stds[stds == 0] = 1
+            weights = beta / stds
+            offset = sources.mean(axis=0) @ weights
+            noise = self.rng.standard_normal(n)
+            noise_scale = chol[k, k]
+            values = np.empty(n, dtype=np.float64)
+
+            def kernel(start: int, stop: int) -> None:
+                # Scale to target distribution in place
+                block = values[start:stop]
+                np.matmul(sources[start:stop], weights, out=block)
+                block -= offset
+                block += noise_scale * noise[start:stop]
+                block *= target_std
+                block += target_mean
+                _bound_and_round(block, min_value, max_value, params.get('round_to'))
+
+        _run_blocks(n, kernel)
+        return _numeric_output(target_col, values, params)
 
     def generate_correlated_fact(
         self,
@@ -426,38 +871,42 @@ class CorrelationEngine:
             DataFrame with correlated columns
         """
         if seed is not None:
-            random.seed(seed)
-            np.random.seed(seed)
+            self.seed = seed
+            self.rng = np.random.default_rng(seed)
+            self._py_rng = random.Random(seed)
 
-        # Generate base columns first
-        data = {}
+        # Generate base columns first, each built directly as a Series
+        data: Dict[str, pl.Series] = {}
         for col_name, config in base_columns.items():
             if isinstance(config, dict):
                 col_type = config.get('type', 'random')
                 if col_type == 'random':
                     mean = config.get('mean', 100)
                     std = config.get('std', 20)
-                    data[col_name] = np.random.normal(mean, std, row_count).tolist()
+                    data[col_name] = pl.Series(col_name, mean + std * self.rng.standard_normal(row_count))
                 elif col_type == 'uniform':
                     min_val = config.get('min', 0)
                     max_val = config.get('max', 100)
-                    data[col_name] = np.random.uniform(min_val, max_val, row_count).tolist()
+                    data[col_name] = pl.Series(col_name, self.rng.uniform(min_val, max_val, row_count))
                 elif col_type == 'choice':
                     options = config.get('options', ['A', 'B', 'C'])
                     weights = config.get('weights')
+                    p = None
                     if weights:
-                        data[col_name] = random.choices(options, weights=weights, k=row_count)
-                    else:
-                        data[col_name] = [random.choice(options) for _ in range(row_count)]
+                        p = np.asarray(weights, dtype=float)
+                        p = p / p.sum()
+                    picks = self.rng.choice(len(options), size=row_count, p=p)
+                    data[col_name] = pl.Series(col_name, options, strict=False).gather(picks)
                 elif col_type == 'sequence':
                     start = config.get('start', 1)
-                    data[col_name] = list(range(start, start + row_count))
+                    data[col_name] = pl.int_range(start, start + row_count, eager=True).alias(col_name)
             elif isinstance(config, list):
                 # List of choices
-                data[col_name] = [random.choice(config) for _ in range(row_count)]
+                picks = self.rng.integers(0, len(config), size=row_count)
+                data[col_name] = pl.Series(col_name, config, strict=False).gather(picks)
             else:
                 # Constant value
-                data[col_name] = [config] * row_count
+                data[col_name] = pl.Series(col_name, [config]).new_from_index(0, row_count)
 
         df = pl.DataFrame(data)
 
@@ -8,12 +8,14 @@ Provides:
 - Currency conversion utilities
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Dict, List, Any, Optional, Tuple
-from datetime import date, datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple, Union
+from datetime import date
 from enum import Enum
+from functools import lru_cache
 import math
-import random
+import os
 
 import polars as pl
 import numpy as np
@@ -124,6 +126,77 @@ CURRENCY_VOLATILITY = {
     'SAR': 0.01,   # Pegged to USD
 }
 
+# ISO_CURRENCIES as index-aligned arrays for vectorized lookups; the extra last
+# slot holds the defaults used for codes outside ISO_CURRENCIES
+CURRENCY_CODES = np.array(list(ISO_CURRENCIES))
+CURRENCY_INDEX = {code: i for i, code in enumerate(ISO_CURRENCIES)}
+UNKNOWN_CURRENCY = len(ISO_CURRENCIES)
+CURRENCY_DECIMALS = np.array(
+    [info['decimal_places'] for info in ISO_CURRENCIES.values()] + [2], dtype=np.int8
+)
+BASE_RATES_ARR = np.array([BASE_RATES_VS_USD.get(code, 1.0) for code in ISO_CURRENCIES] + [1.0])
+VOLATILITY_ARR = np.array([CURRENCY_VOLATILITY.get(code, 0.1) for code in ISO_CURRENCIES] + [0.1])
+
+# Currency reference data as one columnar table, joined against rather than looked up per code
+CURRENCY_REFERENCE = pl.DataFrame(
+    {
+        'currency_code': list(ISO_CURRENCIES),
+        'currency_name': [info['name'] for info in ISO_CURRENCIES.values()],
+        'symbol': [info['symbol'] for info in ISO_CURRENCIES.values()],
+        'decimal_places': [info['decimal_places'] for info in ISO_CURRENCIES.values()],
+        'country': [info['country'] for info in ISO_CURRENCIES.values()],
+        'base_rate_usd': BASE_RATES_ARR[:UNKNOWN_CURRENCY],
+        'volatility': VOLATILITY_ARR[:UNKNOWN_CURRENCY]
+    },
+    schema={
+        'currency_code': pl.Utf8,
+        'currency_name': pl.Utf8,
+        'symbol': pl.Utf8,
+        'decimal_places': pl.Int64,
+        'country': pl.Utf8,
+        'base_rate_usd': pl.Float64,
+        'volatility': pl.Float64
+    }
+)
+
+# Multi-currency fact rows are drawn in fixed-size blocks, in parallel when there are several
+FACT_BLOCK_ROWS = 1_000_000
+MAX_FACT_WORKERS = 8
+
+
+def _currency_indices(codes: List[str]) -> np.ndarray:
+    """Positions of currency codes in the lookup arrays (UNKNOWN_CURRENCY if not listed)"""
+    return np.array([CURRENCY_INDEX.get(code, UNKNOWN_CURRENCY) for code in codes], dtype=np.intp)
+
+
+@lru_cache(maxsize=16)
+def _cholesky_factor(correlation: Tuple[Tuple[float, ...], ...]) -> np.ndarray:
+    """Cholesky factor of a correlation matrix, cached so repeated calls reuse one factorization"""
+    factor = np.linalg.cholesky(np.array(correlation))
+    factor.setflags(write=False)
+    return factor
+
+
+def _gbm_paths(initials: np.ndarray, sigmas: np.ndarray, mu: float, dt: float, shocks: np.ndarray) -> np.ndarray:
+    """
+    Simulate GBM paths for every pair: row i starts at initials[i] and takes one
+    step per column of shocks, so the result has shocks.shape[1] + 1 columns.
+
+    Works in a single preallocated buffer (cumsum and exp in place) so long
+    simulations allocate one (pairs, steps + 1) array in total.
+    """
+    n_pairs, steps = shocks.shape
+    paths = np.empty((n_pairs, steps + 1))
+    paths[:, 0] = 0.0
+    log_returns = paths[:, 1:]
+    np.multiply(shocks, sigmas[:, None] * math.sqrt(dt), out=log_returns)
+    if mu:
+        log_returns += mu * dt
+    np.cumsum(log_returns, axis=1, out=log_returns)
+    np.exp(paths, out=paths)
+    paths *= initials[:, None]
+    return paths
+
 
 @dataclass
 class CurrencyDimension:
@@ -164,29 +237,23 @@ class CurrencyDimensionGenerator:
         else:
             currency_codes = self.major_currencies
 
-        records = []
-        for code in currency_codes:
-            info = ISO_CURRENCIES[code]
-            records.append({
-                'currency_code': code,
-                'currency_name': info['name'],
-                'symbol': info['symbol'],
-                'decimal_places': info['decimal_places'],
-                'country': info['country'],
-                'is_major': code in self.major_currencies
-            })
-
-        return pl.DataFrame(records)
+        return pl.DataFrame({'currency_code': currency_codes}, schema={'currency_code': pl.Utf8}).join(
+            CURRENCY_REFERENCE.select(
+                'currency_code', 'currency_name', 'symbol', 'decimal_places', 'country',
+                pl.col('currency_code').is_in(self.major_currencies).alias('is_major')
+            ),
+            on='currency_code',
+            how='left',
+            maintain_order='left'
+        )
 
 
 class ExchangeRateGenerator:
     """Generate exchange rate time series with realistic volatility"""
 
-    def __init__(self, seed: Optional[int] = None):
+    def __init__(self, seed: Union[int, np.random.SeedSequence, None] = None):
         self.seed = seed
-        if seed is not None:
-            random.seed(seed)
-            np.random.seed(seed)
+        self.rng = np.random.default_rng(seed)
 
     def generate_rates(
         self,
@@ -194,7 +261,8 @@ class ExchangeRateGenerator:
         target_currencies: List[str],
         start_date: str,
         end_date: str,
-        frequency: str = 'daily'
+        frequency: str = 'daily',
+        correlation: Optional[Any] = None
     ) -> pl.DataFrame:
         """
         Generate exchange rates using Geometric Brownian Motion.
@@ -205,33 +273,31 @@ class ExchangeRateGenerator:
             start_date: Start date (YYYY-MM-DD)
             end_date: End date (YYYY-MM-DD)
             frequency: 'daily', 'weekly', or 'monthly'
+            correlation: Optional correlation matrix of the shocks between the
+                non-base targets, in target_currencies order (default: independent)
 
         Returns:
             DataFrame with exchange rates
         """
         # Parse dates
-        start = datetime.strptime(start_date, '%Y-%m-%d').date()
-        end = datetime.strptime(end_date, '%Y-%m-%d').date()
+        start = date.fromisoformat(start_date)
+        end = date.fromisoformat(end_date)
 
         # Generate date range
-        dates = []
-        current = start
-        while current <= end:
-            if frequency == 'daily':
-                # Skip weekends
-                if current.weekday() < 5:
-                    dates.append(current)
-                current += timedelta(days=1)
-            elif frequency == 'weekly':
-                dates.append(current)
-                current += timedelta(days=7)
-            elif frequency == 'monthly':
-                dates.append(current)
-                # Move to next month
-                if current.month == 12:
-                    current = date(current.year + 1, 1, 1)
-                else:
-                    current = date(current.year, current.month + 1, 1)
+        first = np.datetime64(start, 'D')
+        last = np.datetime64(end, 'D')
+        if frequency == 'daily':
+            # Business days only (skip weekends)
+            all_days = np.arange(first, last + 1)
+            dates = all_days[np.is_busday(all_days)]
+        elif frequency == 'weekly':
+            dates = np.arange(first, last + 1, 7)
+        else:
+            # Start date, then the first of each following month
+            month_starts = np.arange(
+                first.astype('datetime64[M]') + 1, last.astype('datetime64[M]') + 1
+            ).astype('datetime64[D]')
+            dates = np.concatenate([[first], month_starts]) if first <= last else month_starts
 
         n_dates = len(dates)
 
@@ -245,50 +311,40 @@ class ExchangeRateGenerator:
 
         # Generate rates for each currency pair
         all_data = {'date': dates}
-
+        pairs = [target for target in target_currencies if target != base_currency]
+
+        # Reference rates of target per 1 base, crossed through USD when needed
+        base_idx = CURRENCY_INDEX.get(base_currency, UNKNOWN_CURRENCY)
+        pair_idx = _currency_indices(pairs)
+        initials = BASE_RATES_ARR[pair_idx] / BASE_RATES_ARR[base_idx]
+        sigmas = np.sqrt(VOLATILITY_ARR[base_idx]**2 + VOLATILITY_ARR[pair_idx]**2)
+
+        # Generate GBM paths for all pairs at once
+        # dS = S * (mu * dt + sigma * sqrt(dt) * Z)  =>  S_t = S_0 * exp(cumsum(mu * dt + sigma * sqrt(dt) * Z))
+        mu = 0  # Assume no drift (random walk)
+        steps = max(n_dates - 1, 0)
+        shocks = self.rng.standard_normal((len(pairs), steps))
+        if correlation is not None and len(pairs) > 1:
+            corr = np.asarray(correlation, dtype=float)
+            if corr.shape != (len(pairs), len(pairs)):
+                raise ValueError(
+                    f"correlation must be a {len(pairs)}x{len(pairs)} matrix over the non-base target currencies"
+                )
+            # Correlated shocks for every step in one matrix product
+            shocks = _cholesky_factor(tuple(map(tuple, corr))) @ shocks
+        paths = _gbm_paths(initials, sigmas, mu, dt, shocks)[:, :n_dates]
+
+        # Round appropriately: larger rates carry fewer decimals
+        decimals = np.where(initials > 100, 2, np.where(initials > 10, 3, 4))
+        scale = np.power(10.0, decimals)[:, None]
+        paths = np.rint(paths * scale) / scale
+
+        rows = dict(zip(pairs, paths))
         for target in target_currencies:
             if target == base_currency:
-                all_data[f'{base_currency}_{target}'] = [1.0] * n_dates
-                continue
-
-            # Get base rate
-            if base_currency == 'USD':
-                initial_rate = BASE_RATES_VS_USD.get(target, 1.0)
-            elif target == 'USD':
-                initial_rate = 1 / BASE_RATES_VS_USD.get(base_currency, 1.0)
+                all_data[f'{base_currency}_{target}'] = np.ones(n_dates)
             else:
-                # Cross rate
-                base_to_usd = BASE_RATES_VS_USD.get(base_currency, 1.0)
-                target_to_usd = BASE_RATES_VS_USD.get(target, 1.0)
-                initial_rate = target_to_usd / base_to_usd
-
-            # Get volatility (combined for cross rates)
-            vol_base = CURRENCY_VOLATILITY.get(base_currency, 0.1)
-            vol_target = CURRENCY_VOLATILITY.get(target, 0.1)
-            sigma = math.sqrt(vol_base**2 + vol_target**2)
-
-            # Generate GBM path
-            # dS = S * (mu * dt + sigma * sqrt(dt) * Z)
-            mu = 0  # Assume no drift (random walk)
-            rates = [initial_rate]
-
-            for _ in range(n_dates - 1):
-                z = np.random.normal(0, 1)
-                drift = mu * dt
-                diffusion = sigma * math.sqrt(dt) * z
-                new_rate = rates[-1] * math.exp(drift + diffusion)
-                rates.append(new_rate)
-
-            # Round appropriately
-            decimal_places = ISO_CURRENCIES.get(target, {}).get('decimal_places', 2)
-            if initial_rate > 100:
-                rates = [round(r, 2) for r in rates]
-            elif initial_rate > 10:
-                rates = [round(r, 3) for r in rates]
-            else:
-                rates = [round(r, 4) for r in rates]
-
-            all_data[f'{base_currency}_{target}'] = rates
+                all_data[f'{base_currency}_{target}'] = rows[target]
 
         return pl.DataFrame(all_data)
 
@@ -320,28 +376,23 @@ class ExchangeRateGenerator:
             frequency=frequency
         )
 
-        # Calculate cross rates
-        result_data = {'date': usd_rates['date'].to_list()}
+        # Calculate cross rates for every pair in one broadcast: cross[i, j] = R[j] / R[i]
+        usd_matrix = np.stack([usd_rates[f'USD_{c}'].to_numpy() for c in currencies])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cross = usd_matrix[None, :, :] / usd_matrix[:, None, :]
+        cross[np.broadcast_to((usd_matrix == 0)[:, None, :], cross.shape)] = np.nan
+        rounded = np.round(cross, 4)
 
-        for base in currencies:
-            for target in currencies:
+        result_data = {'date': usd_rates['date']}
+
+        for i, base in enumerate(currencies):
+            for j, target in enumerate(currencies):
                 if base == target:
                     continue
 
-                col_name = f'{base}_{target}'
-
-                if base == 'USD':
-                    result_data[col_name] = usd_rates[f'USD_{target}'].to_list()
-                elif target == 'USD':
-                    base_rates = usd_rates[f'USD_{base}'].to_list()
-                    result_data[col_name] = [1 / r if r != 0 else None for r in base_rates]
-                else:
-                    base_rates = usd_rates[f'USD_{base}'].to_list()
-                    target_rates = usd_rates[f'USD_{target}'].to_list()
-                    result_data[col_name] = [
-                        round(t / b, 4) if b != 0 else None
-                        for b, t in zip(base_rates, target_rates)
-                    ]
+                # Pairs involving USD keep the pivot rates unrounded
+                values = cross[i, j] if 'USD' in (base, target) else rounded[i, j]
+                result_data[f'{base}_{target}'] = pl.Series(values, nan_to_null=True)
 
         return pl.DataFrame(result_data)
 
@@ -351,10 +402,10 @@ class MultiCurrencyFactGenerator:
 
     def __init__(self, seed: Optional[int] = None):
         self.seed = seed
-        self.rate_generator = ExchangeRateGenerator(seed)
-        if seed is not None:
-            random.seed(seed)
-            np.random.seed(seed)
+        # Independent child streams for the rate shocks and the fact-row draws
+        rate_seq, fact_seq = np.random.SeedSequence(seed).spawn(2)
+        self.rate_generator = ExchangeRateGenerator(rate_seq)
+        self.rng = np.random.default_rng(fact_seq)
 
     def generate(
         self,
@@ -382,7 +433,7 @@ class MultiCurrencyFactGenerator:
             DataFrame with multi-currency fact data
         """
         # Generate exchange rates for the period
-        all_currencies = list(set(transaction_currencies + [reporting_currency]))
+        all_currencies = list(dict.fromkeys(transaction_currencies + [reporting_currency]))
         rates_df = self.rate_generator.generate_rates(
             base_currency=reporting_currency,
             target_currencies=all_currencies,
@@ -390,21 +441,21 @@ class MultiCurrencyFactGenerator:
             end_date=end_date
         )
 
-        # Convert to lookup dict: {date: {currency: rate}}
-        rates_lookup = {}
-        rate_dates = rates_df['date'].to_list()
-        for i, d in enumerate(rate_dates):
-            rates_lookup[d] = {}
-            for curr in all_currencies:
-                col = f'{reporting_currency}_{curr}'
-                if col in rates_df.columns:
-                    rates_lookup[d][curr] = rates_df[col][i]
-                elif curr == reporting_currency:
-                    rates_lookup[d][curr] = 1.0
+        # Rates in long form: one (date, currency, rate) row per observation, planned lazily
+        prefix = f'{reporting_currency}_'
+        rates_long = (
+            rates_df.lazy().unpivot(index='date', variable_name='transaction_currency', value_name='exchange_rate')
+            .select(
+                pl.col('date').cast(pl.Date).alias('rate_date'),
+                pl.col('transaction_currency').str.slice(len(prefix)),
+                pl.col('exchange_rate').cast(pl.Float64)
+            )
+            .sort('rate_date')
+        )
 
         # Generate transaction dates (randomly within range)
-        start = datetime.strptime(start_date, '%Y-%m-%d').date()
-        end = datetime.strptime(end_date, '%Y-%m-%d').date()
+        start = date.fromisoformat(start_date)
+        end = date.fromisoformat(end_date)
         date_range = (end - start).days
 
         # Amount configuration
@@ -416,73 +467,100 @@ class MultiCurrencyFactGenerator:
                 'max': 50000
             }
 
-        # Generate data
-        data = {
-            'transaction_id': list(range(1, row_count + 1)),
-            'transaction_date': [],
-            'transaction_currency': [],
-            'transaction_amount': [],
-            'exchange_rate': [],
-            'reporting_currency': [reporting_currency] * row_count,
-            'reporting_amount': []
-        }
+        # Draw every row's date, currency and amount, one fixed-size block per worker
+        offsets = np.empty(row_count, dtype=np.int64)
+        currency_idx = np.empty(row_count, dtype=np.int64)
+        amounts = np.empty(row_count)
+        lookup_idx = _currency_indices(transaction_currencies)
+        currency_scales = np.power(10.0, CURRENCY_DECIMALS[lookup_idx])
+        bounds = [(start_row, min(start_row + FACT_BLOCK_ROWS, row_count))
+                  for start_row in range(0, row_count, FACT_BLOCK_ROWS)]
+        # Independent child streams per block keep seeded output identical for any worker count
+        block_rngs = self.rng.spawn(len(bounds)) if len(bounds) > 1 else [self.rng]
+
+        def draw_block(block: int) -> None:
+            rng = block_rngs[block]
+            lo, hi = bounds[block]
+            n = hi - lo
+            offsets[lo:hi] = rng.integers(0, date_range + 1, n)
+            currency_idx[lo:hi] = rng.integers(0, len(transaction_currencies), n)
+            block_amounts = amounts[lo:hi]
+            np.clip(
+                rng.normal(amount_config['mean'], amount_config['std'], n),
+                amount_config.get('min', 0),
+                amount_config.get('max', float('inf')),
+                out=block_amounts
+            )
+            scale = currency_scales[currency_idx[lo:hi]]
+            block_amounts *= scale
+            np.rint(block_amounts, out=block_amounts)
+            block_amounts /= scale
+
+        workers = min(MAX_FACT_WORKERS, len(bounds), os.cpu_count() or 1)
+        if workers <= 1:
+            for block in range(len(bounds)):
+                draw_block(block)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(draw_block, range(len(bounds))))
+        tx_dates = np.datetime64(start, 'D') + offsets
 
-        if include_fx_details:
-            data['fx_gain_loss'] = []
-            data['rate_date'] = []
-
-        for i in range(row_count):
-            # Random date
-            days_offset = random.randint(0, date_range)
-            tx_date = start + timedelta(days=days_offset)
-            data['transaction_date'].append(tx_date)
-
-            # Random transaction currency
-            tx_currency = random.choice(transaction_currencies)
-            data['transaction_currency'].append(tx_currency)
-
-            # Random amount
-            amount = random.gauss(amount_config['mean'], amount_config['std'])
-            amount = max(amount_config.get('min', 0), min(amount_config.get('max', float('inf')), amount))
-            decimal_places = ISO_CURRENCIES.get(tx_currency, {}).get('decimal_places', 2)
-            amount = round(amount, decimal_places)
-            data['transaction_amount'].append(amount)
-
-            # Get exchange rate (find closest available date)
-            rate_date = tx_date
-            while rate_date not in rates_lookup and rate_date >= start:
-                rate_date -= timedelta(days=1)
-
-            if rate_date in rates_lookup:
-                rate = rates_lookup[rate_date].get(tx_currency, 1.0)
-            else:
-                # Fallback to base rate
-                rate = BASE_RATES_VS_USD.get(tx_currency, 1.0) / BASE_RATES_VS_USD.get(reporting_currency, 1.0)
-
-            # For reporting amount, we need the inverse
-            # If rate is "reporting per transaction", multiply
-            # If rate is "transaction per reporting", divide
-            # Our rates are base per target, so:
-            if tx_currency == reporting_currency:
-                reporting_amount = amount
-                rate = 1.0
-            else:
-                # rate is reporting currency per 1 transaction currency
-                # So to convert transaction to reporting: divide by rate
-                reporting_amount = amount / rate if rate != 0 else amount
+        # Fallback to base rate when no earlier rate exists, gathered by the same currency index
+        fallback_rates = (
+            BASE_RATES_ARR[lookup_idx] / BASE_RATES_ARR[CURRENCY_INDEX.get(reporting_currency, UNKNOWN_CURRENCY)]
+        )
 
-            reporting_decimal = ISO_CURRENCIES.get(reporting_currency, {}).get('decimal_places', 2)
-            reporting_amount = round(reporting_amount, reporting_decimal)
+        fact = pl.DataFrame({
+            'transaction_id': np.arange(1, row_count + 1),
+            'transaction_date': tx_dates,
+            'transaction_currency': pl.Series(transaction_currencies).gather(currency_idx),
+            'transaction_amount': amounts,
+            'fallback_rate': fallback_rates[currency_idx],
+        })
+
+        # Get exchange rate from the latest available date on or before the transaction
+        fact = (
+            fact.lazy()
+            .sort('transaction_date')
+            .join_asof(
+                rates_long,
+                left_on='transaction_date',
+                right_on='rate_date',
+                by='transaction_currency',
+                strategy='backward',
+                check_sortedness=False  # Both sides are sorted just above
+            )
+            .sort('transaction_id')
+        )
 
-            data['exchange_rate'].append(round(rate, 6))
-            data['reporting_amount'].append(reporting_amount)
+        rate = (
+            pl.when(pl.col('transaction_currency') == reporting_currency).then(1.0)
+            .otherwise(pl.col('exchange_rate').fill_null(pl.col('fallback_rate')))
+        )
 
-            if include_fx_details:
-                data['rate_date'].append(rate_date)
-                # Simplified FX gain/loss (would need settlement date for real calculation)
-                data['fx_gain_loss'].append(0.0)
+        # Rates are reporting currency per 1 transaction currency, so divide to convert
+        reporting_decimal = int(CURRENCY_DECIMALS[CURRENCY_INDEX.get(reporting_currency, UNKNOWN_CURRENCY)])
+        amount = pl.col('transaction_amount')
+        fact = fact.with_columns(rate.alias('exchange_rate')).with_columns(
+            pl.col('exchange_rate').round(6),
+            pl.lit(reporting_currency).alias('reporting_currency'),
+            pl.when(pl.col('exchange_rate') != 0)
+            .then(amount / pl.col('exchange_rate'))
+            .otherwise(amount)
+            .round(reporting_decimal)
+            .alias('reporting_amount'),
+            # Simplified FX gain/loss (would need settlement date for real calculation)
+            pl.lit(0.0).alias('fx_gain_loss')
+        )
 
-        return pl.DataFrame(data)
+        columns = [
+            'transaction_id', 'transaction_date', 'transaction_currency', 'transaction_amount',
+            'exchange_rate', 'reporting_currency', 'reporting_amount'
+        ]
+        if include_fx_details:
+            columns += ['fx_gain_loss', 'rate_date']
+        # Single collect: the join, conversion and projection run as one optimized query
+        return fact.select(columns).collect()
 
 
 def generate_currency_dimension(
@@ -4,11 +4,46 @@ Generates standard date dimension tables for Power BI
 """
 import polars as pl
 from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
+from datetime import date
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Output columns in order, with the narrowest dtype that holds each attribute
+DATE_DIMENSION_SCHEMA = {
+    'date_key': pl.Int32,
+    'full_date': pl.Date,
+    'year': pl.Int16,
+    'quarter': pl.Int8,
+    'month': pl.Int8,
+    'month_name': pl.Utf8,
+    'month_name_short': pl.Utf8,
+    'week': pl.Int8,
+    'day_of_month': pl.Int8,
+    'day_of_week': pl.Int8,
+    'day_name': pl.Utf8,
+    'day_name_short': pl.Utf8,
+    'day_of_year': pl.Int16,
+    'is_weekend': pl.Boolean,
+    'is_weekday': pl.Boolean,
+    'year_month': pl.Utf8,
+    'year_quarter': pl.Utf8,
+    'fiscal_year': pl.Int16,
+    'fiscal_quarter': pl.Int8,
+    'fiscal_month': pl.Int8
+}
+
+# Fixed-date holidays per country, keyed by (month, day)
+HOLIDAYS = {
+    # Common US holidays (simplified)
+    'US': {
+        (1, 1): "New Year's Day",
+        (7, 4): "Independence Day",
+        (12, 25): "Christmas Day",
+        (12, 31): "New Year's Eve"
+    }
+}
+
 
 class DateDimensionGenerator:
     """Generates date dimension tables"""
@@ -45,76 +80,65 @@ class DateDimensionGenerator:
         """
         try:
             # Parse dates
-            start = datetime.strptime(start_date, '%Y-%m-%d')
-            end = datetime.strptime(end_date, '%Y-%m-%d')
+            start = date.fromisoformat(start_date)
+            end = date.fromisoformat(end_date)
 
             if end < start:
                 return {'success': False, 'error': 'End date must be after start date'}
 
-            # Generate all dates
-            dates = []
-            current = start
-            while current <= end:
-                dates.append(current)
-                current += timedelta(days=1)
-
-            # Build dimension columns
-            data = {
-                'date_key': [],
-                'full_date': [],
-                'year': [],
-                'quarter': [],
-                'month': [],
-                'month_name': [],
-                'month_name_short': [],
-                'week': [],
-                'day_of_month': [],
-                'day_of_week': [],
-                'day_name': [],
-                'day_name_short': [],
-                'day_of_year': [],
-                'is_weekend': [],
-                'is_weekday': [],
-                'year_month': [],
-                'year_quarter': [],
-                'fiscal_year': [],
-                'fiscal_quarter': [],
-                'fiscal_month': []
-            }
-
-            for dt in dates:
-                data['date_key'].append(int(dt.strftime('%Y%m%d')))
-                data['full_date'].append(dt.date())
-                data['year'].append(dt.year)
-                data['quarter'].append((dt.month - 1) // 3 + 1)
-                data['month'].append(dt.month)
-                data['month_name'].append(self.month_names[dt.month - 1])
-                data['month_name_short'].append(self.month_names[dt.month - 1][:3])
-                data['week'].append(dt.isocalendar()[1])
-                data['day_of_month'].append(dt.day)
-                data['day_of_week'].append(dt.weekday() + 1)
-                data['day_name'].append(self.day_names[dt.weekday()])
-                data['day_name_short'].append(self.day_names[dt.weekday()][:3])
-                data['day_of_year'].append(dt.timetuple().tm_yday)
-                data['is_weekend'].append(dt.weekday() >= 5)
-                data['is_weekday'].append(dt.weekday() < 5)
-                data['year_month'].append(f"{dt.year}-{dt.month:02d}")
-                data['year_quarter'].append(f"{dt.year}-Q{(dt.month - 1) // 3 + 1}")
-
-                # Calculate fiscal year/quarter/month
-                fiscal_info = self._calculate_fiscal(dt, fiscal_year_start_month)
-                data['fiscal_year'].append(fiscal_info['fiscal_year'])
-                data['fiscal_quarter'].append(fiscal_info['fiscal_quarter'])
-                data['fiscal_month'].append(fiscal_info['fiscal_month'])
+            # Generate all dates and derive the calendar columns as expressions
+            df = pl.DataFrame({'full_date': pl.date_range(start, end, '1d', eager=True)})
+            month_names = dict(enumerate(self.month_names, start=1))
+            day_names = dict(enumerate(self.day_names, start=1))
+
+            df = df.with_columns(
+                pl.col('full_date').dt.year().cast(pl.Int16).alias('year'),
+                pl.col('full_date').dt.month().cast(pl.Int8).alias('month'),
+                pl.col('full_date').dt.day().cast(pl.Int8).alias('day_of_month'),
+                pl.col('full_date').dt.weekday().cast(pl.Int8).alias('day_of_week'),
+                pl.col('full_date').dt.week().cast(pl.Int8).alias('week'),
+                pl.col('full_date').dt.ordinal_day().cast(pl.Int16).alias('day_of_year'),
+            ).with_columns(
+                (
+                    pl.col('year').cast(pl.Int32) * 10000
+                    + pl.col('month').cast(pl.Int32) * 100
+                    + pl.col('day_of_month')
+                ).alias('date_key'),
+                ((pl.col('month') - 1) // 3 + 1).alias('quarter'),
+                pl.col('month').replace_strict(month_names, return_dtype=pl.Utf8).alias('month_name'),
+                pl.col('day_of_week').replace_strict(day_names, return_dtype=pl.Utf8).alias('day_name'),
+                (pl.col('day_of_week') >= 6).alias('is_weekend'),
+                (pl.col('day_of_week') < 6).alias('is_weekday'),
+                pl.format('{}-{}', 'year', pl.col('month').cast(pl.Utf8).str.zfill(2)).alias('year_month'),
+            ).with_columns(
+                pl.col('month_name').str.slice(0, 3).alias('month_name_short'),
+                pl.col('day_name').str.slice(0, 3).alias('day_name_short'),
+                pl.format('{}-Q{}', 'year', 'quarter').alias('year_quarter'),
+            )
+
+            # Calculate fiscal year/quarter/month
+            fiscal_month = (pl.col('month') - fiscal_year_start_month) % 12 + 1
+            if fiscal_year_start_month == 1:
+                fiscal_year = pl.col('year')
+            else:
+                # Fiscal year ends next calendar year
+                fiscal_year = pl.col('year') + (pl.col('month') >= fiscal_year_start_month).cast(pl.Int16)
+            df = df.with_columns(
+                fiscal_year.alias('fiscal_year'),
+                ((fiscal_month - 1) // 3 + 1).alias('fiscal_quarter'),
+                fiscal_month.alias('fiscal_month'),
+            ).select(
+                pl.col(name).cast(dtype) for name, dtype in DATE_DIMENSION_SCHEMA.items()
+            )
 
             # Add holiday columns if requested
             if include_holidays:
-                holidays = self._get_holidays(dates, holiday_country)
-                data['is_holiday'] = holidays['is_holiday']
-                data['holiday_name'] = holidays['holiday_name']
-
-            # Create DataFrame
-            df = pl.DataFrame(data)
+                holidays = self._get_holidays(holiday_country)
+                df = df.join(
+                    holidays, on=['month', 'day_of_month'], how='left', maintain_order='left'
+                ).with_columns(
+                    pl.col('holiday_name').is_not_null().alias('is_holiday')
+                ).select(pl.exclude('holiday_name'), 'holiday_name')
 
             # Save if output path provided
             if output_path:
@@ -142,56 +166,15 @@ class DateDimensionGenerator:
             logger.error(f"Error generating date dimension: {e}", exc_info=True)
             return {'success': False, 'error': str(e)}
 
-    def _calculate_fiscal(self, dt: datetime, fiscal_start_month: int) -> Dict[str, int]:
-        """Calculate fiscal year, quarter, and month"""
-        if fiscal_start_month == 1:
-            # Standard calendar year
-            return {
-                'fiscal_year': dt.year,
-                'fiscal_quarter': (dt.month - 1) // 3 + 1,
-                'fiscal_month': dt.month
-            }
-
-        # Calculate fiscal year offset
-        if dt.month >= fiscal_start_month:
-            fiscal_year = dt.year + 1  # Fiscal year ends next calendar year
-            fiscal_month = dt.month - fiscal_start_month + 1
-        else:
-            fiscal_year = dt.year
-            fiscal_month = dt.month + (12 - fiscal_start_month) + 1
-
-        fiscal_quarter = (fiscal_month - 1) // 3 + 1
-
-        return {
-            'fiscal_year': fiscal_year,
-            'fiscal_quarter': fiscal_quarter,
-            'fiscal_month': fiscal_month
-        }
-
-    def _get_holidays(self, dates: list, country: str) -> Dict[str, list]:
-        """Get holiday information for dates"""
+    def _get_holidays(self, country: str) -> pl.DataFrame:
+        """Get the holiday calendar for a country as a (month, day_of_month, holiday_name) table"""
         # Simple holiday detection - could be enhanced with holidays library
-        is_holiday = []
-        holiday_name = []
-
-        # Common US holidays (simplified)
-        us_holidays = {
-            (1, 1): "New Year's Day",
-            (7, 4): "Independence Day",
-            (12, 25): "Christmas Day",
-            (12, 31): "New Year's Eve"
-        }
-
-        for dt in dates:
-            key = (dt.month, dt.day)
-            if country.upper() == 'US' and key in us_holidays:
-                is_holiday.append(True)
-                holiday_name.append(us_holidays[key])
-            else:
-                is_holiday.append(False)
-                holiday_name.append(None)
-
-        return {
-            'is_holiday': is_holiday,
-            'holiday_name': holiday_name
-        }
+        holidays = HOLIDAYS.get(country.upper(), {})
+        return pl.DataFrame(
+            {
+                'month': [month for month, _ in holidays],
+                'day_of_month': [day for _, day in holidays],
+                'holiday_name': list(holidays.values())
+            },
+            schema={'month': pl.Int8, 'day_of_month': pl.Int8, 'holiday_name': pl.Utf8}
+        )
@@ -3,13 +3,22 @@ Dimension Generator Module
 Generates dimension tables with realistic data
 """
 import polars as pl
-from typing import Dict, Any, List, Optional
+from datetime import date
+from typing import Callable, Dict, Any, List, Optional, Union
 from faker import Faker
+import numpy as np
+import math
 import random
+import re
+import string
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Output tuning: parquet row groups small enough to read in parallel, large CSV write batches
+PARQUET_ROW_GROUP_ROWS = 100_000
+CSV_BATCH_ROWS = 64 * 1024
+
 
 class DimensionGenerator:
     """Generates dimension tables"""
@@ -79,10 +88,85 @@ class DimensionGenerator:
             {'name': 'region', 'generator': 'region'},
         ],
     }
+    # Keys are lowercase; each template is an immutable sequence of column definitions
+    DIMENSION_TEMPLATES = {name.casefold(): tuple(cols) for name, cols in DIMENSION_TEMPLATES.items()}
+    _TEMPLATE_NAMES = ', '.join(DIMENSION_TEMPLATES)
 
-    def __init__(self, locale: str = 'en_US'):
-        self.faker = Faker(locale)
-        self.locale = locale
+    # Fixed vocabularies for the business generators
+    CATEGORIES = ('Electronics', 'Clothing', 'Food', 'Home', 'Office', 'Sports')
+    DEPARTMENTS = ('Sales', 'Marketing', 'Engineering', 'Finance', 'HR', 'Operations')
+    REGIONS = ('North', 'South', 'East', 'West', 'Central')
+    SEGMENTS = ('Enterprise', 'Mid-Market', 'SMB', 'Consumer')
+    PRODUCT_SUFFIXES = ('Pro', 'Plus', 'Basic', 'Premium')
+    _VOCABULARIES = {
+        'category': CATEGORIES,
+        'department': DEPARTMENTS,
+        'region': REGIONS,
+        'segment': SEGMENTS
+    }
+    # Reserved example domains, as Faker's own email() uses
+    EMAIL_DOMAINS = ('example.com', 'example.org', 'example.net')
+
+    # Generators synthesised in bulk from word pools instead of one Faker call per row
+    _FAST_GENERATORS = {
+        'first_name', 'last_name', 'name', 'email', 'city', 'state', 'country',
+        'department', 'category', 'region', 'segment', 'sku', 'product_name'
+    }
+
+    # Generator names that map onto a Faker method of a different name
+    _FAKER_ATTR_MAP = {
+        'phone': 'phone_number',
+        'zipcode': 'postcode',  # postcode exists in every locale, zipcode only in en_US
+        'uuid': 'uuid4',
+    }
+
+    # Generators implemented here rather than by Faker, by method name
+    _CUSTOM_GENERATORS = {
+        'date': '_fake_date',
+        'text': '_fake_text',
+        'sku': '_fake_sku',
+        'product_name': '_fake_product_name',
+        'category': '_fake_category',
+        'department': '_fake_department',
+        'region': '_fake_region',
+        'segment': '_fake_segment',
+    }
+
+    # Polars dtypes of the default type generators and of Faker generators known to return text
+    _TYPE_DTYPES = {
+        'string': pl.Utf8,
+        'integer': pl.Int64,
+        'decimal': pl.Float64,
+        'date': pl.Date,
+        'boolean': pl.Boolean,
+    }
+    # Bulk generator of each default type, by method name; unknown types draw strings
+    _BULK_TYPE = {
+        'string': '_draw_string',
+        'integer': '_draw_integer',
+        'decimal': '_draw_decimal',
+        'date': '_draw_date',
+        'boolean': '_draw_boolean',
+    }
+    _STRING_GENERATORS = {
+        'company', 'phone', 'address', 'zipcode', 'job', 'text', 'sentence', 'word', 'uuid'
+    }
+
+    # First batch size for unique columns, relative to the rows needed
+    UNIQUE_OVERSHOOT = 1.3
+
+    # Number of Faker calls used to seed a pool when the locale has no word list for a generator
+    FAKER_POOL_SIZE = 1000
+
+    def __init__(self, locale: str = 'en_US', seed: Optional[int] = None):
+        self.seed = seed
+        self._seed_seq = np.random.SeedSequence(seed)
+        self._rng = np.random.default_rng(seed)
+        self._py_rng = random.Random(seed)
+        # Faker instances and word pools per locale, kept so switching back is free
+        self._fakers = {}
+        self._locale_pools = {}
+        self._use_locale(locale)
 
     def generate(
         self,
@@ -112,17 +196,15 @@ class DimensionGenerator:
         """
         # Handle locale override
         if locale and locale != self.locale:
-            self.faker = Faker(locale)
-            self.locale = locale
+            self._use_locale(locale)
 
         # If dimension_type provided, use template
         if dimension_type:
-            template = self.DIMENSION_TEMPLATES.get(dimension_type.lower())
+            template = self.DIMENSION_TEMPLATES.get(dimension_type.casefold())
             if not template:
                 return {
                     'success': False,
-                    'error': f"Unknown dimension type: {dimension_type}. "
-                             f"Available: {', '.join(self.DIMENSION_TEMPLATES.keys())}"
+                    'error': f"Unknown dimension type: {dimension_type}. Available: {self._TEMPLATE_NAMES}"
                 }
             columns = template
             name = name or f"dim_{dimension_type}"
@@ -132,40 +214,23 @@ class DimensionGenerator:
 
         try:
             data = {}
+            for series in self._build_columns(columns, row_count):
+                data[series.name] = series
 
-            for col_def in columns:
-                col_name = col_def['name']
-                col_type = col_def.get('type', 'string')
-                generator = col_def.get('generator')
-                unique = col_def.get('unique', False)
-                nullable = col_def.get('nullable', False)
-                values = col_def.get('values')
-
-                # Generate column data
-                col_data = self._generate_column(
-                    col_type, generator, row_count, unique, values
-                )
-
-                # Add nulls if nullable
-                if nullable and not unique:
-                    null_indices = random.sample(
-                        range(row_count),
-                        int(row_count * random.uniform(0.01, 0.05))
-                    )
-                    for idx in null_indices:
-                        col_data[idx] = None
-
-                data[col_name] = col_data
-
-            # Create DataFrame
-            df = pl.DataFrame(data)
+            # Create DataFrame from the typed columns
+            df = pl.DataFrame(list(data.values()))
 
             # Save if output path provided
             if output_path:
                 if output_format == 'parquet':
-                    df.write_parquet(output_path)
+                    df.write_parquet(
+                        output_path,
+                        compression='snappy',
+                        row_group_size=max(1, min(len(df), PARQUET_ROW_GROUP_ROWS)),
+                        use_pyarrow=True
+                    )
                 else:
-                    df.write_csv(output_path)
+                    df.write_csv(output_path, batch_size=CSV_BATCH_ROWS)
 
             return {
                 'success': True,
@@ -181,6 +246,81 @@ class DimensionGenerator:
             logger.error(f"Error generating dimension: {e}", exc_info=True)
             return {'success': False, 'error': str(e)}
 
+    def _use_locale(self, locale: str):
+        """Switch to the locale's Faker and word pools, creating them on first use"""
+        if locale not in self._fakers:
+            faker = Faker(locale)
+            faker.seed_instance(self.seed)
+            self._fakers[locale] = faker
+            self._locale_pools[locale] = {}
+        self.faker = self._fakers[locale]
+        self._pools = self._locale_pools[locale]
+        self.locale = locale
+
+    def _build_columns(self, columns: List[Dict[str, Any]], row_count: int) -> List[pl.Series]:
+        """Generate every column, each from its own child seed sequence"""
+        seeds = self._seed_seq.spawn(len(columns))
+        series = []
+        for seed_seq, col_def in zip(seeds, columns):
+            self._reseed(seed_seq)
+            series.append(self._build_column(col_def, row_count))
+        return series
+
+    def _reseed(self, seed_seq: np.random.SeedSequence):
+        """Point the numpy, Python and Faker streams at one child sequence; pools stay shared"""
+        column_seed = int(seed_seq.generate_state(1)[0])
+        self._rng = np.random.default_rng(seed_seq)
+        self._py_rng = random.Random(column_seed)
+        self.faker.seed_instance(column_seed)
+
+    def _build_column(self, col_def: Dict[str, Any], row_count: int) -> pl.Series:
+        """Generate one column as a typed Series, with nulls injected if nullable"""
+        col_name = col_def['name']
+        col_type = col_def.get('type', 'string')
+        generator = col_def.get('generator')
+        unique = col_def.get('unique', False)
+        nullable = col_def.get('nullable', False)
+        values = col_def.get('values')
+
+        # Generate column data
+        col_data = self._generate_column(
+            col_type, generator, row_count, unique, values
+        )
+
+        dtype = self._column_dtype(col_type, generator, unique, values)
+        # Inferred columns may mix types (e.g. ints and floats): let Polars find the supertype
+        series = pl.Series(col_name, col_data, dtype=dtype, strict=dtype is not None)
+
+        # Add nulls if nullable: null out a random 1-5% of rows in one masked pass
+        if nullable and not unique:
+            null_rate = self._rng.uniform(0.01, 0.05)
+            series = series.set(pl.Series(self._rng.random(row_count) < null_rate), None)
+
+        return series
+
+    def _column_dtype(
+        self,
+        col_type: str,
+        generator: Optional[str],
+        unique: bool,
+        values: Optional[List]
+    ) -> Optional[pl.DataType]:
+        """Known output dtype for a column definition, or None to let Polars infer it"""
+        # Closed text domains become Enums (unique columns may be padded beyond the domain)
+        if values:
+            if not unique and all(isinstance(v, str) for v in values):
+                return pl.Enum(list(dict.fromkeys(values)))
+            return None
+        if generator:
+            if generator in self._VOCABULARIES and not unique:
+                return pl.Enum(list(self._VOCABULARIES[generator]))
+            if generator in ('date', 'date_of_birth') and not unique:
+                return pl.Date
+            if generator in self._FAST_GENERATORS or generator in self._STRING_GENERATORS:
+                return pl.Utf8
+            return None
+        return self._TYPE_DTYPES.get(col_type, pl.Utf8)
+
     def _generate_column(
         self,
         col_type: str,
@@ -188,96 +328,241 @@ class DimensionGenerator:
         count: int,
         unique: bool,
         values: Optional[List] = None
-    ) -> List:
+    ) -> Union[List, np.ndarray, pl.Series]:
         """Generate data for a single column"""
         if values:
-            # Choose from fixed values
+            # Choose from fixed values by index into a typed Series (Enum codes for closed text domains)
+            pool = pl.Series(values, dtype=self._column_dtype(col_type, None, unique, values), strict=False)
             if unique:
                 if len(values) < count:
                     raise ValueError(f"Not enough unique values ({len(values)}) for {count} rows")
-                return random.sample(values, count)
-            return [random.choice(values) for _ in range(count)]
+                return pool.gather(self._rng.permutation(len(values))[:count])
+            return pool.gather(self._rng.integers(0, len(values), count))
 
         if generator:
             return self._generate_with_faker(generator, count, unique)
 
-        # Default generators by type
-        type_generators = {
-            'string': lambda: self.faker.word(),
-            'integer': lambda: random.randint(1, 10000),
-            'decimal': lambda: round(random.uniform(0, 10000), 2),
-            'date': lambda: self.faker.date_this_decade(),
-            'boolean': lambda: random.choice([True, False])
-        }
-
-        gen_func = type_generators.get(col_type, type_generators['string'])
+        if unique and col_type == 'integer':
+            # Unique integers are surrogate keys: number the rows 1..count
+            return np.arange(1, count + 1, dtype=np.int64)
 
+        draw_name = self._BULK_TYPE.get(col_type, '_draw_string')
+        draw = getattr(self, draw_name)
         if unique:
-            values_set = set()
-            values_list = []
-            attempts = 0
-            while len(values_list) < count and attempts < count * 10:
-                val = gen_func()
-                if val not in values_set:
-                    values_set.add(val)
-                    values_list.append(val)
-                attempts += 1
-            return values_list
-        else:
-            return [gen_func() for _ in range(count)]
+            values_list = self._draw_unique(lambda n: pl.Series(draw(n)).to_list(), count)
+            return self._pad_unique(values_list, count) if draw_name == '_draw_string' else values_list
+        return draw(count)
+
+    def _draw_string(self, count: int) -> pl.Series:
+        pool = self._pool('word')
+        if pool is not None:
+            return self._gather(pool, count)
+        return pl.Series([self.faker.word() for _ in range(count)], dtype=pl.Utf8)
+
+    def _draw_integer(self, count: int) -> np.ndarray:
+        return self._rng.integers(1, 10001, count)
+
+    def _draw_decimal(self, count: int) -> np.ndarray:
+        return np.round(self._rng.uniform(0, 10000, count), 2)
+
+    def _draw_date(self, count: int) -> np.ndarray:
+        # Same range as Faker's date_this_decade: start of the decade up to today
+        today = date.today()
+        start = np.datetime64(date(today.year - today.year % 10, 1, 1), 'D')
+        span = (np.datetime64(today, 'D') - start).astype(np.int64) + 1
+        return start + self._rng.integers(0, span, count)
 
-    def _generate_with_faker(self, generator: str, count: int, unique: bool) -> List:
+    def _draw_boolean(self, count: int) -> np.ndarray:
+        return self._rng.integers(0, 2, count).astype(bool)
+
+    def _generate_with_faker(self, generator: str, count: int, unique: bool) -> Union[List, pl.Series]:
         """Generate data using Faker"""
-        # Map common generator names to faker methods
-        faker_map = {
-            'name': self.faker.name,
-            'first_name': self.faker.first_name,
-            'last_name': self.faker.last_name,
-            'company': self.faker.company,
-            'email': self.faker.email,
-            'phone': self.faker.phone_number,
-            'address': self.faker.address,
-            'city': self.faker.city,
-            'state': self.faker.state,
-            'country': self.faker.country,
-            'zipcode': self.faker.zipcode,
-            'date': lambda: self.faker.date_this_decade(),
-            'date_of_birth': self.faker.date_of_birth,
-            'job': self.faker.job,
-            'text': lambda: self.faker.text(max_nb_chars=50),
-            'sentence': self.faker.sentence,
-            'word': self.faker.word,
-            'uuid': self.faker.uuid4,
-            'sku': lambda: self.faker.bothify(text='???-#####').upper(),
-            'product_name': lambda: f"{self.faker.word().title()} {random.choice(['Pro', 'Plus', 'Basic', 'Premium'])}",
-            'category': lambda: random.choice(['Electronics', 'Clothing', 'Food', 'Home', 'Office', 'Sports']),
-            'department': lambda: random.choice(['Sales', 'Marketing', 'Engineering', 'Finance', 'HR', 'Operations']),
-            'region': lambda: random.choice(['North', 'South', 'East', 'West', 'Central']),
-            'segment': lambda: random.choice(['Enterprise', 'Mid-Market', 'SMB', 'Consumer'])
+        if generator in self._FAST_GENERATORS and self._generate_fast(generator, 0) is not None:
+            if not unique:
+                return self._generate_fast(generator, count)
+            draw = lambda n: self._generate_fast(generator, n).to_list()
+        else:
+            custom = self._CUSTOM_GENERATORS.get(generator)
+            if custom:
+                gen_func = getattr(self, custom)
+            else:
+                # Fall back to the Faker method of the same name, then to a plain word
+                gen_func = getattr(self.faker, self._FAKER_ATTR_MAP.get(generator, generator), None) or self.faker.word
+            if not unique:
+                return [gen_func() for _ in range(count)]
+            draw = lambda n: [gen_func() for _ in range(n)]
+
+        return self._pad_unique(self._draw_unique(draw, count), count)
+
+    def _draw_unique(self, draw: Callable[[int], List], count: int) -> List:
+        """Collect count distinct values from batches of draw(n), growing the batch until 10x count tries"""
+        found = {}
+        tried = 0
+        batch = math.ceil(count * self.UNIQUE_OVERSHOOT)
+        while len(found) < count and tried < count * 10:
+            batch = min(batch, count * 10 - tried)
+            seen = len(found)
+            # dict.fromkeys dedupes while keeping first-seen order
+            found.update(dict.fromkeys(draw(batch)))
+            tried += batch
+            batch *= 2
+            if len(found) == seen:
+                # A whole batch found nothing new: the domain is exhausted, leave the rest to padding
+                break
+        return list(found)[:count]
+
+    def _pad_unique(self, values_list: List, count: int) -> List:
+        """Pad distinct values up to count with numbered copies, composed in one pass without more draws"""
+        need = count - len(values_list)
+        if need > 0 and values_list:
+            bases = pl.Series(values_list, strict=False).cast(pl.Utf8).gather(np.arange(need) % len(values_list))
+            values_list.extend(self._concat([bases, '_', pl.Series(np.arange(need)).cast(pl.Utf8)]).to_list())
+        return values_list
+
+    def _fake_date(self):
+        return self.faker.date_this_decade()
+
+    def _fake_text(self) -> str:
+        return self.faker.text(max_nb_chars=50)
+
+    def _fake_sku(self) -> str:
+        return self.faker.bothify(text='???-#####').upper()
+
+    def _fake_product_name(self) -> str:
+        return f"{self.faker.word().title()} {self._py_rng.choice(self.PRODUCT_SUFFIXES)}"
+
+    def _fake_category(self) -> str:
+        return self._py_rng.choice(self.CATEGORIES)
+
+    def _fake_department(self) -> str:
+        return self._py_rng.choice(self.DEPARTMENTS)
+
+    def _fake_region(self) -> str:
+        return self._py_rng.choice(self.REGIONS)
+
+    def _fake_segment(self) -> str:
+        return self._py_rng.choice(self.SEGMENTS)
+
+    def _generate_fast(self, generator: str, count: int) -> Optional[pl.Series]:
+        """Compose values in Arrow memory from sampled word pools; None if the locale lacks a pool"""
+        if generator in self._VOCABULARIES:
+            vocabulary = self._VOCABULARIES[generator]
+            return self._gather((pl.Series(vocabulary, dtype=pl.Enum(vocabulary)), None), count)
+
+        if generator == 'sku':
+            # Same shape as bothify('???-#####').upper(): three letters, a dash, five digits
+            letters = (np.array(list(string.ascii_uppercase)), None)
+            digits = pl.Series(self._rng.integers(0, 100000, count)).cast(pl.Utf8).str.zfill(5)
+            return self._concat([self._gather(letters, count) for _ in range(3)] + ['-', digits])
+
+        if generator == 'product_name':
+            words = self._pool('word')
+            if words is None:
+                return None
+            return self._concat([
+                self._gather(words, count).str.to_titlecase(), ' ',
+                self._gather((np.array(self.PRODUCT_SUFFIXES), None), count)
+            ])
+
+        if generator in ('name', 'email'):
+            first = self._pool('first_name' if generator == 'name' else 'email_first_name')
+            last = self._pool('last_name' if generator == 'name' else 'email_last_name')
+            if first is None or last is None:
+                return None
+            if generator == 'name':
+                parts = [self._gather(first, count), self._gather(last, count)]
+                family_name_first, separator = self._name_layout()
+                if family_name_first:
+                    parts.reverse()
+                return self._concat([parts[0], separator, parts[1]])
+            domains = (np.array(self.EMAIL_DOMAINS), None)
+            return self._concat([
+                self._gather(first, count), '.', self._gather(last, count), '@', self._gather(domains, count)
+            ])
+
+        pool = self._pool(generator)
+        if pool is None:
+            return None
+        return self._gather(pool, count)
+
+    @staticmethod
+    def _concat(parts: List[Union[pl.Series, str]]) -> pl.Series:
+        """Join equal-length string Series and literal separators row-wise"""
+        return pl.select(pl.concat_str([
+            pl.lit(part) if isinstance(part, str) else part for part in parts
+        ])).to_series()
+
+    def _gather(self, pool: tuple, count: int) -> pl.Series:
+        """Sample count values from a (values, probabilities) pool; a Series pool keeps its dtype"""
+        values, probs = pool
+        if probs is None:
+            indices = self._rng.integers(0, len(values), count)
+        else:
+            indices = self._rng.choice(len(values), count, p=probs)
+        return pl.Series(values).gather(indices)
+
+    def _pool(self, key: str) -> Optional[tuple]:
+        """Word pool for the current locale as (values, probabilities), built once per locale"""
+        if key not in self._pools:
+            self._pools[key] = self._load_pool(key)
+        return self._pools[key]
+
+    def _name_layout(self) -> tuple:
+        """
+        Order and separator of the locale's most common name format, as
+        (family name first, separator): ja_JP gives (True, ' '), zh_CN (True, '').
+        """
+        if 'name_layout' not in self._pools:
+            formats = getattr(self.faker.factories[0].provider('faker.providers.person'), 'formats', None) or ()
+            if isinstance(formats, dict):
+                formats = sorted(formats, key=formats.get, reverse=True)
+            first_format = str(next(iter(formats), ''))
+            # Text between the first two placeholders, e.g. '' in '{{last_name}}{{first_name}}'
+            between = re.match(r'\{\{\w+\}\}(.*?)\{\{', first_format)
+            self._pools['name_layout'] = (
+                first_format.startswith('{{last_name'),
+                between.group(1) if between else ' '
+            )
+        return self._pools['name_layout']
+
+    def _load_pool(self, key: str) -> Optional[tuple]:
+        """Read a word list from the locale's Faker providers"""
+        sources = {
+            'first_name': ('faker.providers.person', 'first_names'),
+            'last_name': ('faker.providers.person', 'last_names'),
+            'email_first_name': ('faker.providers.person', 'first_names'),
+            'email_last_name': ('faker.providers.person', 'last_names'),
+            'state': ('faker.providers.address', 'states'),
+            'country': ('faker.providers.address', 'countries'),
+            'city': ('faker.providers.address', 'cities'),
+            'word': ('faker.providers.lorem', 'word_list'),
         }
+        provider_name, attribute = sources[key]
+        provider = self.faker.factories[0].provider(provider_name)
+        words = getattr(provider, attribute, None) if provider is not None else None
 
-        gen_func = faker_map.get(generator)
-        if not gen_func:
-            # Try to get attribute from faker directly
-            if hasattr(self.faker, generator):
-                gen_func = getattr(self.faker, generator)
-            else:
-                gen_func = self.faker.word
+        if not words:
+            if key != 'city':
+                return None
+            # No fixed city list (e.g. en_US composes names): sample a pool from Faker once
+            words = [self.faker.city() for _ in range(self.FAKER_POOL_SIZE)]
 
-        if unique:
-            values_set = set()
-            values_list = []
-            attempts = 0
-            while len(values_list) < count and attempts < count * 10:
-                val = gen_func()
-                if val not in values_set:
-                    values_set.add(val)
-                    values_list.append(val)
-                attempts += 1
-            if len(values_list) < count:
-                # Pad with numbered values if we couldn't get enough uniques
-                for i in range(count - len(values_list)):
-                    values_list.append(f"{gen_func()}_{i}")
-            return values_list
+        if isinstance(words, dict):
+            values = list(words.keys())
+            weights = np.array(list(words.values()), dtype=float)
+            probs = weights / weights.sum()
         else:
-            return [gen_func() for _ in range(count)]
+            values = list(words)
+            probs = None
+
+        if key in ('email_first_name', 'email_last_name'):
+            # Email local parts need plain lowercase ASCII names
+            keep = [i for i, v in enumerate(values) if v.isascii() and v.isalpha()]
+            if not keep:
+                return None
+            values = [values[i].lower() for i in keep]
+            if probs is not None:
+                probs = probs[keep] / probs[keep].sum()
+
+        return np.array(values), probs
+
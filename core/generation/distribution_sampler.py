@@ -3,7 +3,7 @@ Distribution Sampler Module
 Provides various statistical distributions for data generation
 """
 import numpy as np
-from typing import List, Optional, Union
+from typing import List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,8 +13,14 @@ class DistributionSampler:
     """Samples values from various statistical distributions"""
 
     def __init__(self, seed: Optional[int] = None):
-        if seed:
-            np.random.seed(seed)
+        self.rng = np.random.default_rng(seed)
+
+    @staticmethod
+    def _finish(values: np.ndarray, as_int: bool) -> np.ndarray:
+        """Round samples to whole numbers (int64) or to 2 decimals"""
+        if as_int:
+            return np.rint(values).astype(np.int64, copy=False)
+        return np.round(values, 2)
 
     def uniform(
         self,
@@ -22,12 +28,10 @@ class DistributionSampler:
         low: float = 0.0,
         high: float = 1.0,
         as_int: bool = False
-    ) -> List[Union[int, float]]:
+    ) -> np.ndarray:
         """Sample from uniform distribution"""
-        values = np.random.uniform(low, high, count)
-        if as_int:
-            return [int(round(v)) for v in values]
-        return [round(float(v), 2) for v in values]
+        values = self.rng.uniform(low, high, count)
+        return self._finish(values, as_int)
 
     def normal(
         self,
@@ -37,18 +41,16 @@ class DistributionSampler:
         min_val: Optional[float] = None,
         max_val: Optional[float] = None,
         as_int: bool = False
-    ) -> List[Union[int, float]]:
+    ) -> np.ndarray:
         """Sample from normal (Gaussian) distribution"""
-        values = np.random.normal(mean, std, count)
+        values = self.rng.normal(mean, std, count)
 
         if min_val is not None or max_val is not None:
             values = np.clip(values,
                            min_val if min_val is not None else -np.inf,
                            max_val if max_val is not None else np.inf)
 
-        if as_int:
-            return [int(round(v)) for v in values]
-        return [round(float(v), 2) for v in values]
+        return self._finish(values, as_int)
 
     def lognormal(
         self,
@@ -57,13 +59,11 @@ class DistributionSampler:
         sigma: float = 1.0,
         scale: float = 1.0,
         as_int: bool = False
-    ) -> List[Union[int, float]]:
+    ) -> np.ndarray:
         """Sample from lognormal distribution (good for amounts: many small, few large)"""
-        values = np.random.lognormal(mean, sigma, count) * scale
+        values = self.rng.lognormal(mean, sigma, count) * scale
 
-        if as_int:
-            return [int(round(v)) for v in values]
-        return [round(float(v), 2) for v in values]
+        return self._finish(values, as_int)
 
     def exponential(
         self,
@@ -71,32 +71,28 @@ class DistributionSampler:
         scale: float = 1.0,
         min_val: float = 0.0,
         as_int: bool = False
-    ) -> List[Union[int, float]]:
+    ) -> np.ndarray:
         """Sample from exponential distribution"""
-        values = np.random.exponential(scale, count) + min_val
+        values = self.rng.exponential(scale, count) + min_val
 
-        if as_int:
-            return [int(round(v)) for v in values]
-        return [round(float(v), 2) for v in values]
+        return self._finish(values, as_int)
 
     def poisson(
         self,
         count: int,
         lam: float = 1.0
-    ) -> List[int]:
+    ) -> np.ndarray:
         """Sample from Poisson distribution (good for counts)"""
-        values = np.random.poisson(lam, count)
-        return [int(v) for v in values]
+        return self.rng.poisson(lam, count).astype(np.int64, copy=False)
 
     def binomial(
         self,
         count: int,
         n: int,
         p: float
-    ) -> List[int]:
+    ) -> np.ndarray:
         """Sample from binomial distribution"""
-        values = np.random.binomial(n, p, count)
-        return [int(v) for v in values]
+        return self.rng.binomial(n, p, count).astype(np.int64, copy=False)
 
     def pareto(
         self,
@@ -104,13 +100,11 @@ class DistributionSampler:
         alpha: float = 1.0,
         scale: float = 1.0,
         as_int: bool = False
-    ) -> List[Union[int, float]]:
+    ) -> np.ndarray:
         """Sample from Pareto distribution (80/20 rule)"""
-        values = (np.random.pareto(alpha, count) + 1) * scale
+        values = (self.rng.pareto(alpha, count) + 1) * scale
 
-        if as_int:
-            return [int(round(v)) for v in values]
-        return [round(float(v), 2) for v in values]
+        return self._finish(values, as_int)
 
     def beta(
         self,
@@ -119,12 +113,12 @@ class DistributionSampler:
         b: float = 5.0,
         min_val: float = 0.0,
         max_val: float = 1.0
-    ) -> List[float]:
+    ) -> np.ndarray:
         """Sample from beta distribution (good for proportions/percentages)"""
-        values = np.random.beta(a, b, count)
+        values = self.rng.beta(a, b, count)
         # Scale to range
         values = values * (max_val - min_val) + min_val
-        return [round(float(v), 4) for v in values]
+        return np.round(values, 4)
 
     def weighted_choice(
         self,
@@ -137,9 +131,9 @@ class DistributionSampler:
             # Normalize weights
             total = sum(weights)
             probs = [w / total for w in weights]
-            indices = np.random.choice(len(values), count, p=probs)
+            indices = self.rng.choice(len(values), count, p=probs)
         else:
-            indices = np.random.choice(len(values), count)
+            indices = self.rng.choice(len(values), count)
 
         return [values[i] for i in indices]
 
@@ -148,17 +142,17 @@ class DistributionSampler:
         count: int,
         start: int = 1,
         step: int = 1
-    ) -> List[int]:
+    ) -> np.ndarray:
         """Generate sequential integers"""
-        return list(range(start, start + count * step, step))
+        return start + step * np.arange(count, dtype=np.int64)
 
     def cyclic(
         self,
         count: int,
         values: List
-    ) -> List:
+    ) -> np.ndarray:
         """Cycle through values repeatedly"""
-        result = []
-        for i in range(count):
-            result.append(values[i % len(values)])
-        return result
+        # An object array keeps each value's Python type (no coercion of mixed values to strings)
+        pool = np.empty(len(values), dtype=object)
+        pool[:] = values
+        return np.resize(pool, count)
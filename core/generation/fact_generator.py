@@ -4,13 +4,34 @@ Generates fact tables linked to dimension tables
 """
 import polars as pl
 from typing import Dict, Any, List, Optional
-import random
 import numpy as np
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _alias_table(weights) -> tuple:
+    """Vose's alias tables (prob, alias) for drawing indices in proportion to weights"""
+    weights = np.asarray(weights, dtype=float)
+    if not np.isfinite(weights).all() or (weights < 0).any():
+        raise ValueError("Weights must be finite and non-negative")
+    if weights.sum() <= 0:
+        raise ValueError("Weights must have a positive sum")
+    k = len(weights)
+    prob = weights * (k / weights.sum())
+    alias = np.arange(k)
+    small = [i for i in range(k) if prob[i] < 1.0]
+    large = [i for i in range(k) if prob[i] >= 1.0]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        alias[s] = l
+        prob[l] += prob[s] - 1.0
+        (small if prob[l] < 1.0 else large).append(l)
+    # Leftovers are 1 up to rounding error
+    prob[small + large] = 1.0
+    return prob, alias
+
+
 class FactGenerator:
     """Generates fact tables with referential integrity"""
 
@@ -93,8 +114,17 @@ class FactGenerator:
         }
     }
 
-    def __init__(self):
-        pass
+    # Alias tables of the weighted template attributes, keyed by (fact type, attribute name)
+    _TEMPLATE_ALIAS_TABLES = {
+        (fact_type, attr['name']): _alias_table(attr['weights'])
+        for fact_type, template in FACT_TEMPLATES.items()
+        for attr in template.get('attributes', [])
+        if attr.get('weights')
+    }
+
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
 
     def generate_from_type(
         self,
@@ -116,7 +146,8 @@ class FactGenerator:
             Generation result with 'success' and 'df' keys
         """
         try:
-            template = self.FACT_TEMPLATES.get(fact_type.lower())
+            fact_type_key = fact_type.lower()
+            template = self.FACT_TEMPLATES.get(fact_type_key)
             if not template:
                 return {
                     'success': False,
@@ -140,9 +171,9 @@ class FactGenerator:
                 if key_col is None:
                     key_col = dim_df.columns[0]
 
-                key_values = dim_df[key_col].to_list()
-                if key_values:
-                    data[key_col] = random.choices(key_values, k=row_count)
+                key_values = dim_df[key_col]
+                if len(key_values):
+                    data[key_col] = key_values.gather(self.rng.integers(0, len(key_values), row_count))
 
             # Generate measures
             for measure_def in template['measures']:
@@ -165,12 +196,13 @@ class FactGenerator:
 
                 if attr_values:
                     attr_data = self._generate_categorical(
-                        attr_values, row_count, attr_weights
+                        attr_values, row_count, attr_weights,
+                        self._TEMPLATE_ALIAS_TABLES.get((fact_type_key, attr_name))
                     )
                     data[attr_name] = attr_data
 
-            # Create DataFrame
-            df = pl.DataFrame(data)
+            # Create DataFrame from the typed columns (Series and NumPy arrays, no list inference)
+            df = pl.DataFrame([pl.Series(col_name, values) for col_name, values in data.items()])
 
             return {
                 'success': True,
@@ -232,31 +264,29 @@ class FactGenerator:
                     raise ValueError(f"Unsupported file format: {path}")
 
                 # Get key values
-                key_values = dim_df[key_column].to_list()
-                dim_values[key_column] = key_values
+                dim_values[key_column] = dim_df[key_column]
 
-                # Get weights if specified
+                # Get weights if specified (missing weights count as 0)
                 if weight_column and weight_column in dim_df.columns:
-                    weights = dim_df[weight_column].to_list()
-                    # Normalize weights
-                    total = sum(w for w in weights if w is not None)
-                    dim_weights[key_column] = [w / total if w else 0 for w in weights]
+                    weights = dim_df[weight_column].fill_null(0).to_numpy().astype(float)
+                    if weights.sum() > 0:
+                        dim_weights[key_column] = _alias_table(weights)
 
             # Generate foreign key columns
             for key_col in grain:
                 if key_col in dim_values:
                     values = dim_values[key_col]
-                    weights = dim_weights.get(key_col)
+                    table = dim_weights.get(key_col)
 
-                    if weights:
-                        # Weighted random selection
-                        data[key_col] = random.choices(values, weights=weights, k=row_count)
+                    if table:
+                        # Weighted random selection through the alias tables
+                        data[key_col] = values.gather(self._alias_sample(table, row_count))
                     else:
                         # Uniform random selection
-                        data[key_col] = random.choices(values, k=row_count)
+                        data[key_col] = values.gather(self.rng.integers(0, len(values), row_count))
                 else:
                     # Generate sequential IDs if no dimension provided
-                    data[key_col] = list(range(1, row_count + 1))
+                    data[key_col] = np.arange(1, row_count + 1, dtype=np.int64)
 
             # Generate measure/attribute columns
             for measure_def in measures:
@@ -273,7 +303,7 @@ class FactGenerator:
                         )
                     else:
                         # Default empty string if no values provided
-                        data[measure_name] = [''] * row_count
+                        data[measure_name] = pl.repeat('', row_count, dtype=pl.Utf8, eager=True)
                 else:
                     # Numeric types
                     distribution = measure_def.get('distribution', 'uniform')
@@ -288,8 +318,8 @@ class FactGenerator:
                     )
                     data[measure_name] = measure_data
 
-            # Create DataFrame
-            df = pl.DataFrame(data)
+            # Create DataFrame from the typed columns (Series and NumPy arrays, no list inference)
+            df = pl.DataFrame([pl.Series(col_name, values) for col_name, values in data.items()])
 
             # Save if output path provided
             if output_path:
@@ -323,62 +353,85 @@ class FactGenerator:
         mean_val: Optional[float],
         std_val: Optional[float],
         measure_type: str
-    ) -> List:
+    ) -> np.ndarray:
         """Generate measure values based on distribution"""
         if distribution == 'uniform':
-            values = np.random.uniform(min_val, max_val, count)
+            values = self.rng.uniform(min_val, max_val, count)
 
         elif distribution == 'normal':
             if mean_val is None:
                 mean_val = (min_val + max_val) / 2
             if std_val is None:
                 std_val = (max_val - min_val) / 6
-            values = np.random.normal(mean_val, std_val, count)
+            values = self.rng.normal(mean_val, std_val, count)
             # Clip to range
             values = np.clip(values, min_val, max_val)
 
         elif distribution == 'lognormal':
-            # Lognormal for amounts (many small, few large)
+            # Lognormal for amounts (many small, few large), offset so exp(0) lands on min_val:
+            # by default +/-3 sigma of the underlying normal spans [min_val, max_val]
+            log_span = np.log(max_val - min_val + 1)
             if mean_val is None:
-                mean_val = np.log((min_val + max_val) / 2)
+                mean_val = log_span / 2
             if std_val is None:
-                std_val = 1.0
-            values = np.random.lognormal(mean_val, std_val, count)
-            # Scale to range
-            values = (values - values.min()) / (values.max() - values.min()) * (max_val - min_val) + min_val
+                std_val = log_span / 6
+            values = self.rng.lognormal(mean_val, std_val, count) + (min_val - 1)
+            values = np.clip(values, min_val, max_val)
 
         elif distribution == 'exponential':
             scale = (max_val - min_val) / 3
-            values = np.random.exponential(scale, count) + min_val
+            values = self.rng.exponential(scale, count) + min_val
             values = np.clip(values, min_val, max_val)
 
         else:
-            values = np.random.uniform(min_val, max_val, count)
+            values = self.rng.uniform(min_val, max_val, count)
 
-        # Convert to appropriate type
+        # Convert to appropriate type, keeping the array for Polars to take over directly
         if measure_type == 'integer':
-            return [int(round(v)) for v in values]
+            return np.rint(values).astype(np.int64)
         else:
-            return [round(float(v), 2) for v in values]
+            return np.round(values, 2)
+
+    def _alias_sample(self, table: tuple, count: int) -> np.ndarray:
+        """Draw count indices from alias tables in two vectorised passes"""
+        prob, alias = table
+        picks = self.rng.integers(0, len(prob), count)
+        return np.where(self.rng.random(count) < prob[picks], picks, alias[picks])
 
     def _generate_categorical(
         self,
         values: List[str],
         count: int,
-        weights: Optional[List[float]] = None
-    ) -> List[str]:
+        weights: Optional[List[float]] = None,
+        table: Optional[tuple] = None
+    ) -> pl.Series:
         """
         Generate categorical values with optional weighted distribution.
 
         Args:
             values: List of possible categorical values
             count: Number of values to generate
-            weights: Optional weights for each value (must sum to ~1.0)
+            weights: Optional non-negative weights, one per value; they are
+                normalised, so they need not sum to 1.0
+            table: Optional prebuilt alias tables for the weights
 
         Returns:
-            List of randomly selected categorical values
+            Series of randomly selected categorical values
         """
-        if weights:
-            return random.choices(values, weights=weights, k=count)
+        if table is None and weights:
+            if len(weights) != len(values):
+                raise ValueError(
+                    f"Got {len(weights)} weights for {len(values)} categorical values"
+                )
+            table = _alias_table(weights)
+        elif table is not None and len(table[0]) != len(values):
+            raise ValueError(
+                f"Alias table has {len(table[0])} entries for {len(values)} categorical values"
+            )
+        if table is not None:
+            indices = self._alias_sample(table, count)
         else:
-            return random.choices(values, k=count)
+            indices = self.rng.integers(0, len(values), count)
+        # Closed text domains become Enums, sampled as dictionary codes
+        dtype = pl.Enum(list(dict.fromkeys(values))) if all(isinstance(v, str) for v in values) else None
+        return pl.Series(values, dtype=dtype, strict=False).gather(indices)
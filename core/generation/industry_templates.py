@@ -392,6 +392,9 @@ class IndustrySchemaGenerator:
         """
         if seed is not None:
             random.seed(seed)
+            # The generators draw from their own seeded streams rather than the global one
+            self.dimension_gen = DimensionGenerator(seed=seed)
+            self.fact_gen = FactGenerator(seed)
 
         template = self.templates.get(template_name)
         if not template:
@@ -519,6 +522,8 @@ class IndustrySchemaGenerator:
         """Generate a custom dimension with specified columns"""
         from faker import Faker
         fake = Faker()
+        # Follow the (possibly seeded) global stream so a schema seed covers custom dimensions too
+        fake.seed_instance(random.getrandbits(32))
 
         data = {}
         for col in columns:
@@ -217,7 +217,8 @@ def register_editing_handlers(registry):
         file_paths: List[str],
         output_path: str,
         merge_type: str = 'union',
-        join_keys: Optional[List[str]] = None
+        join_keys: Optional[List[str]] = None,
+        needed_columns: Optional[Dict[str, List[str]]] = None
     ) -> Dict[str, Any]:
         """Merge multiple files"""
         try:
@@ -231,7 +232,7 @@ def register_editing_handlers(registry):
             elif merge_type == 'join':
                 if not join_keys:
                     return {'success': False, 'error': 'join_keys required for join merge'}
-                result = polars_engine.join_files(file_paths, join_keys)
+                result = polars_engine.join_files(file_paths, join_keys, needed_columns=needed_columns)
             else:
                 return {'success': False, 'error': f'Unknown merge type: {merge_type}'}
 
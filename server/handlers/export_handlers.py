@@ -56,7 +56,8 @@ def register_export_handlers(registry):
     def export_parquet(
         file_path: str,
         output_path: str,
-        compression: str = 'snappy'
+        compression: str = 'zstd',
+        compression_level: Optional[int] = 3
     ) -> Dict[str, Any]:
         """Export to Parquet format (reads CSV, Excel, or Parquet)"""
         if not os.path.exists(file_path):
@@ -68,7 +69,8 @@ def register_export_handlers(registry):
             result = parquet_exporter.export(
                 df=df,
                 output_path=output_path,
-                compression=compression
+                compression=compression,
+                compression_level=compression_level
             )
 
             return result
@@ -99,26 +101,28 @@ def register_export_handlers(registry):
         try:
             df = read_data_file(file_path)
 
-            # Optimize
+            ext = os.path.splitext(output_path)[1].lower()
+
+            # Optimize; Parquet output streams the casts straight into the writer
             opt_result = powerbi_optimizer.optimize_for_powerbi(
                 df=df,
-                table_type=table_type
+                table_type=table_type,
+                return_lazy=ext != '.csv'
             )
 
             if not opt_result['success']:
                 return opt_result
 
-            optimized_df = opt_result['optimized_df']
-
             # Write output
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            ext = os.path.splitext(output_path)[1].lower()
             if ext == '.csv':
+                optimized_df = opt_result['optimized_df']
                 optimized_df.write_csv(output_path)
-            elif ext == '.parquet':
-                optimized_df.write_parquet(output_path)
+                columns = optimized_df.columns
             else:
-                optimized_df.write_parquet(output_path)
+                optimized_lf = opt_result['optimized_lf']
+                optimized_lf.sink_parquet(output_path)
+                columns = optimized_lf.collect_schema().names()
 
             return {
                 'success': True,
@@ -127,8 +131,8 @@ def register_export_handlers(registry):
                 'optimized_size_bytes': opt_result['optimized_size_bytes'],
                 'size_reduction_pct': opt_result['size_reduction_pct'],
                 'optimizations_applied': opt_result['optimizations_applied'],
-                'row_count': len(optimized_df),
-                'columns': optimized_df.columns
+                'row_count': opt_result['row_count'],
+                'columns': columns
             }
 
         except Exception as e:
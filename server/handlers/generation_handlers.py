@@ -761,6 +761,7 @@ def register_generation_handlers(registry):
         end_date: str,
         base_currency: str = 'USD',
         frequency: str = 'daily',
+        correlation: Optional[List[List[float]]] = None,
         seed: Optional[int] = None
     ) -> Dict[str, Any]:
         """Generate exchange rate time series"""
@@ -773,7 +774,8 @@ def register_generation_handlers(registry):
                 target_currencies=target_currencies,
                 start_date=start_date,
                 end_date=end_date,
-                frequency=frequency
+                frequency=frequency,
+                correlation=correlation
             )
 
             # Write output
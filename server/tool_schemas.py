@@ -188,6 +188,7 @@ TOOL_SCHEMAS = {
             'start_date': {'type': 'string', 'description': 'Start date (YYYY-MM-DD)'},
             'end_date': {'type': 'string', 'description': 'End date (YYYY-MM-DD)'},
             'frequency': {'type': 'string', 'enum': ['daily', 'weekly', 'monthly'], 'default': 'daily'},
+            'correlation': {'type': 'array', 'items': {'type': 'array', 'items': {'type': 'number'}}, 'description': 'Optional correlation matrix between the non-base target currencies, in target_currencies order'},
             'seed': {'type': 'integer', 'description': 'Random seed for reproducibility'}
         },
         'required': ['output_path', 'target_currencies', 'start_date', 'end_date']
@@ -266,7 +267,8 @@ TOOL_SCHEMAS = {
             'file_paths': {'type': 'array', 'items': {'type': 'string'}, 'description': 'Files to merge (.csv, .xlsx, .xls, .parquet)'},
             'merge_type': {'type': 'string', 'enum': ['union', 'join'], 'default': 'union'},
             'output_path': {'type': 'string', 'description': 'Output file path'},
-            'join_keys': {'type': 'array', 'description': 'Keys for join (if merge_type=join)'}
+            'join_keys': {'type': 'array', 'description': 'Keys for join (if merge_type=join)'},
+            'needed_columns': {'type': 'object', 'description': 'Optional map of file index (0-based) to columns to keep from that file (join only; join keys always kept)'}
         },
         'required': ['file_paths', 'output_path']
     },
@@ -358,7 +360,8 @@ TOOL_SCHEMAS = {
         'parameters': {
             'file_path': {'type': 'string', 'description': 'Source file (.csv, .xlsx, .xls, .parquet)'},
             'output_path': {'type': 'string', 'description': 'Output Parquet path'},
-            'compression': {'type': 'string', 'enum': ['snappy', 'gzip', 'lz4', 'zstd'], 'default': 'snappy'}
+            'compression': {'type': 'string', 'enum': ['snappy', 'gzip', 'lz4', 'zstd'], 'default': 'zstd'},
+            'compression_level': {'type': 'integer', 'description': 'Compression level for gzip/zstd (zstd: 1-22)', 'default': 3}
         },
         'required': ['file_path', 'output_path']
     },